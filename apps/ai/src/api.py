@@ -2,34 +2,42 @@
 FastAPI HTTP API for voice processing (STT/TTS utilities).
 """
 
+import asyncio
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, File, HTTPException, UploadFile
-from fastapi.responses import Response
+import httpx
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 
-from .config import (
-    VOSK_MODEL_PATH,
-    KOKORO_MODEL_PATH,
-    KOKORO_VOICES_PATH,
-    KOKORO_VOICE,
-    KOKORO_SPEED,
-    KOKORO_LANG,
-)
+from .config import CFG
+from .logging_setup import configure_logging
 from .services.voice_service import VoiceService
 from .services.shared import get_shared_services
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Global services (initialized on startup)
 voice_service: VoiceService | None = None
 
+# Dedicated pools for CPU-bound Vosk/Kokoro work so it never runs on the event loop
+_stt_executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="stt-")
+_tts_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts-")
+
+# Upload types we can decode (the Node proxy forwards blobs as octet-stream)
+_AUDIO_CONTENT_TYPES = {"application/octet-stream", "video/webm", "video/mp4"}
+
+# Fixed replies from the Node voice/chat routes, synthesized at startup
+_CANNED_REPLIES = (
+    "I didn't catch that. Could you please repeat?",
+    "I had trouble understanding that. Could you try rephrasing?",
+)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -38,16 +46,34 @@ async def lifespan(app: FastAPI):
 
     logger.info("Initializing voice service...")
     voice_service = VoiceService(
-        vosk_model_path=VOSK_MODEL_PATH,
-        kokoro_model_path=KOKORO_MODEL_PATH,
-        kokoro_voices_path=KOKORO_VOICES_PATH,
-        kokoro_voice=KOKORO_VOICE,
-        kokoro_speed=KOKORO_SPEED,
-        kokoro_lang=KOKORO_LANG,
+        vosk_model_path=CFG.VOSK_MODEL_PATH,
+        kokoro_model_path=CFG.KOKORO_MODEL_PATH,
+        kokoro_voices_path=CFG.KOKORO_VOICES_PATH,
+        kokoro_voice=CFG.KOKORO_VOICE,
+        kokoro_speed=CFG.KOKORO_SPEED,
+        kokoro_lang=CFG.KOKORO_LANG,
+        tts_cache_size=CFG.TTS_CACHE_SIZE,
+        tts_threads=CFG.TTS_THREADS,
+        stt_cache_size=CFG.STT_CACHE_SIZE,
+    )
+    # Load models in the background so the first request doesn't pay for it
+    loop = asyncio.get_running_loop()
+    if voice_service.is_stt_available():
+        loop.run_in_executor(_stt_executor, voice_service.prewarm_stt)
+    if voice_service.is_tts_available():
+        loop.run_in_executor(_tts_executor, voice_service.prewarm, _CANNED_REPLIES)
+
+    # Shared async HTTP client so outbound calls never block the event loop;
+    # the pool keeps keep-alive sockets to Ollama warm between requests
+    app.state.http = httpx.AsyncClient(
+        timeout=60.0,
+        limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=30.0),
     )
 
     yield
 
+    await app.state.http.aclose()
+
 
 app = FastAPI(
     title="ESP32 AI Voice API",
@@ -57,6 +83,15 @@ app = FastAPI(
 )
 
 
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject oversized uploads from Content-Length before the body is read."""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > CFG.MAX_AUDIO_BYTES:
+        return JSONResponse(status_code=413, content={"detail": "Audio upload too large"})
+    return await call_next(request)
+
+
 class TranscriptionResponse(BaseModel):
     text: str
     success: bool
@@ -73,17 +108,42 @@ class HealthResponse(BaseModel):
     llm_available: bool
 
 
+async def _check_ollama(base_url: str) -> bool:
+    """Probe Ollama through the shared async client."""
+    try:
+        response = await app.state.http.get(f"{base_url}/api/tags", timeout=5.0)
+        return response.status_code == 200
+    except httpx.HTTPError as e:
+        logger.debug(f"Ollama not available: {e}")
+        return False
+
+
+# Health is recomputed at most every _HEALTH_TTL seconds, however often it is polled
+_HEALTH_TTL = 2.0
+_health_cache: tuple[float, HealthResponse] | None = None
+_health_lock = asyncio.Lock()
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Check service health and availability."""
-    shared = get_shared_services()
-    ollama = shared.ollama
-    return HealthResponse(
-        status="ok",
-        stt_available=voice_service.is_stt_available() if voice_service else False,
-        tts_available=voice_service.is_tts_available() if voice_service else False,
-        llm_available=ollama.is_available() if ollama else False,
-    )
+    global _health_cache
+
+    async with _health_lock:
+        now = time.monotonic()
+        if _health_cache is not None and now < _health_cache[0]:
+            return _health_cache[1]
+
+        shared = get_shared_services()
+        ollama = shared.ollama
+        health = HealthResponse(
+            status="ok",
+            stt_available=voice_service.is_stt_available() if voice_service else False,
+            tts_available=voice_service.is_tts_available() if voice_service else False,
+            llm_available=await _check_ollama(ollama.base_url) if ollama else False,
+        )
+        _health_cache = (now + _HEALTH_TTL, health)
+        return health
 
 
 @app.post("/voice/transcribe", response_model=TranscriptionResponse)
@@ -96,9 +156,15 @@ async def transcribe_audio(audio: UploadFile = File(...)):
     if not voice_service or not voice_service.is_stt_available():
         raise HTTPException(status_code=503, detail="Speech-to-text service not available")
 
+    content_type = (audio.content_type or "application/octet-stream").split(";")[0].strip().lower()
+    if not content_type.startswith("audio/") and content_type not in _AUDIO_CONTENT_TYPES:
+        raise HTTPException(status_code=415, detail=f"Unsupported audio type: {content_type}")
+    if audio.size is not None and audio.size > CFG.MAX_AUDIO_BYTES:
+        raise HTTPException(status_code=413, detail="Audio upload too large")
+
     try:
-        audio_data = await audio.read()
-        text = voice_service.transcribe(audio_data)
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(_stt_executor, voice_service.transcribe_stream, audio.file)
         return TranscriptionResponse(text=text, success=True)
     except Exception as e:
         logger.error(f"Transcription failed: {e}")
@@ -116,8 +182,10 @@ async def synthesize_speech(request: ChatRequest):
         raise HTTPException(status_code=503, detail="Text-to-speech service not available")
 
     try:
-        audio_data = voice_service.synthesize(request.message)
+        loop = asyncio.get_running_loop()
+        audio_data = await loop.run_in_executor(_tts_executor, voice_service.synthesize, request.message)
         return Response(content=audio_data, media_type="audio/wav")
     except Exception as e:
         logger.error(f"Synthesis failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
@@ -1,37 +1,125 @@
 import os
+from dataclasses import dataclass
+from functools import lru_cache
+
 from dotenv import load_dotenv
 
-load_dotenv()
+# Skip re-reading .env when the environment is already provided (e.g. docker compose)
+if not os.getenv("ENV_LOADED"):
+    load_dotenv()
+
+
+def _int_env(name: str, default: str) -> int:
+    value = os.getenv(name, default)
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}") from None
+
+
+def _float_env(name: str, default: str) -> float:
+    value = os.getenv(name, default)
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got {value!r}") from None
+
+
+@dataclass(frozen=True)
+class Config:
+    """Environment configuration, parsed and validated once."""
+
+    # MQTT Configuration
+    MQTT_HOST: str
+    MQTT_PORT: int
+    MQTT_USERNAME: str | None
+    MQTT_PASSWORD: str | None
+
+    # Ollama Configuration
+    OLLAMA_URL: str
+    OLLAMA_MODEL: str
+    OLLAMA_CACHE_SIZE: int
+
+    # API Configuration (for fetching context)
+    API_URL: str
+
+    # Rules Configuration
+    RULES_PATH: str
+
+    # Device defaults
+    DEFAULT_DEVICE_ID: str
+    DEFAULT_LOCATION: str
 
-# MQTT Configuration
-MQTT_HOST = os.getenv("MQTT_HOST", "localhost")
-MQTT_PORT = int(os.getenv("MQTT_PORT", "1883"))
-MQTT_USERNAME = os.getenv("MQTT_USERNAME")
-MQTT_PASSWORD = os.getenv("MQTT_PASSWORD")
+    # Voice Configuration
+    VOSK_MODEL_PATH: str
+    MAX_AUDIO_BYTES: int
+    STT_CACHE_SIZE: int
 
-# Ollama Configuration
-OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
-OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "phi3:mini")
+    # Kokoro TTS Configuration
+    KOKORO_MODEL_PATH: str
+    KOKORO_VOICES_PATH: str
+    KOKORO_VOICE: str
+    KOKORO_SPEED: float
+    KOKORO_LANG: str
+    TTS_CACHE_SIZE: int
+    TTS_THREADS: int
 
-# API Configuration (for fetching context)
-API_URL = os.getenv("API_URL", "http://localhost:3000")
+    # HTTP API Configuration
+    HTTP_PORT: int
 
-# Rules Configuration
-RULES_PATH = os.getenv("RULES_PATH", "config/rules.yaml")
 
-# Device defaults
-DEFAULT_DEVICE_ID = os.getenv("DEFAULT_DEVICE_ID", "esp32-1")
-DEFAULT_LOCATION = os.getenv("DEFAULT_LOCATION", "garage")
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Parse the environment into a Config (cached after the first call)."""
+    return Config(
+        MQTT_HOST=os.getenv("MQTT_HOST", "localhost"),
+        MQTT_PORT=_int_env("MQTT_PORT", "1883"),
+        MQTT_USERNAME=os.getenv("MQTT_USERNAME"),
+        MQTT_PASSWORD=os.getenv("MQTT_PASSWORD"),
+        OLLAMA_URL=os.getenv("OLLAMA_URL", "http://localhost:11434"),
+        OLLAMA_MODEL=os.getenv("OLLAMA_MODEL", "phi3:mini"),
+        OLLAMA_CACHE_SIZE=_int_env("OLLAMA_CACHE_SIZE", "256"),
+        API_URL=os.getenv("API_URL", "http://localhost:3000"),
+        RULES_PATH=os.getenv("RULES_PATH", "config/rules.yaml"),
+        DEFAULT_DEVICE_ID=os.getenv("DEFAULT_DEVICE_ID", "esp32-1"),
+        DEFAULT_LOCATION=os.getenv("DEFAULT_LOCATION", "garage"),
+        VOSK_MODEL_PATH=os.getenv("VOSK_MODEL_PATH", "models/vosk-model-small-en-us-0.15"),
+        MAX_AUDIO_BYTES=_int_env("MAX_AUDIO_BYTES", str(10 * 1024 * 1024)),
+        STT_CACHE_SIZE=_int_env("STT_CACHE_SIZE", "64"),
+        KOKORO_MODEL_PATH=os.getenv("KOKORO_MODEL_PATH", "models/kokoro-v1.0.onnx"),
+        KOKORO_VOICES_PATH=os.getenv("KOKORO_VOICES_PATH", "models/voices-v1.0.bin"),
+        KOKORO_VOICE=os.getenv("KOKORO_VOICE", "af_heart"),
+        KOKORO_SPEED=_float_env("KOKORO_SPEED", "1.0"),
+        KOKORO_LANG=os.getenv("KOKORO_LANG", "en-us"),
+        TTS_CACHE_SIZE=_int_env("TTS_CACHE_SIZE", "256"),
+        TTS_THREADS=_int_env("TTS_THREADS", "0"),
+        HTTP_PORT=_int_env("HTTP_PORT", "8000"),
+    )
 
-# Voice Configuration
-VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "models/vosk-model-small-en-us-0.15")
 
-# Kokoro TTS Configuration
-KOKORO_MODEL_PATH = os.getenv("KOKORO_MODEL_PATH", "models/kokoro-v1.0.onnx")
-KOKORO_VOICES_PATH = os.getenv("KOKORO_VOICES_PATH", "models/voices-v1.0.bin")
-KOKORO_VOICE = os.getenv("KOKORO_VOICE", "af_heart")
-KOKORO_SPEED = float(os.getenv("KOKORO_SPEED", "1.0"))
-KOKORO_LANG = os.getenv("KOKORO_LANG", "en-us")
+# Validate at import so bad values fail fast on startup
+CFG = get_config()
 
-# HTTP API Configuration
-HTTP_PORT = int(os.getenv("HTTP_PORT", "8000"))
+# Module-level names for `from .config import X`
+MQTT_HOST = CFG.MQTT_HOST
+MQTT_PORT = CFG.MQTT_PORT
+MQTT_USERNAME = CFG.MQTT_USERNAME
+MQTT_PASSWORD = CFG.MQTT_PASSWORD
+OLLAMA_URL = CFG.OLLAMA_URL
+OLLAMA_MODEL = CFG.OLLAMA_MODEL
+OLLAMA_CACHE_SIZE = CFG.OLLAMA_CACHE_SIZE
+API_URL = CFG.API_URL
+RULES_PATH = CFG.RULES_PATH
+DEFAULT_DEVICE_ID = CFG.DEFAULT_DEVICE_ID
+DEFAULT_LOCATION = CFG.DEFAULT_LOCATION
+VOSK_MODEL_PATH = CFG.VOSK_MODEL_PATH
+MAX_AUDIO_BYTES = CFG.MAX_AUDIO_BYTES
+STT_CACHE_SIZE = CFG.STT_CACHE_SIZE
+KOKORO_MODEL_PATH = CFG.KOKORO_MODEL_PATH
+KOKORO_VOICES_PATH = CFG.KOKORO_VOICES_PATH
+KOKORO_VOICE = CFG.KOKORO_VOICE
+KOKORO_SPEED = CFG.KOKORO_SPEED
+KOKORO_LANG = CFG.KOKORO_LANG
+TTS_CACHE_SIZE = CFG.TTS_CACHE_SIZE
+TTS_THREADS = CFG.TTS_THREADS
+HTTP_PORT = CFG.HTTP_PORT
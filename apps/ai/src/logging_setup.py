@@ -0,0 +1,36 @@
+"""
+Logging setup shared by the orchestrator (main.py) and the HTTP API (api.py).
+
+Records are handed to a QueueHandler so emitting is a non-blocking queue put;
+a background QueueListener thread does the actual writes to stderr.
+"""
+
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_listener: QueueListener | None = None
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """Route root logging through a queue. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    # Flush anything still queued on interpreter exit
+    atexit.register(_listener.stop)
@@ -8,15 +8,20 @@ Monitors sensor telemetry and makes decisions using:
 """
 
 import logging
+import queue
 import signal
 import sys
 import threading
 import time
+from collections import deque
 from pathlib import Path
+from typing import Sequence
 
 import uvicorn
 
+from .api import app
 from .config import RULES_PATH, HTTP_PORT
+from .logging_setup import configure_logging
 from .models.telemetry import TelemetryMessage
 from .models.command import Command, CommandAck
 from .services.mqtt_client import MqttService
@@ -24,13 +29,12 @@ from .services.decision_engine import DecisionEngine
 from .services.shared import get_shared_services
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# Upper bound on telemetry messages drained per worker wakeup
+_TELEMETRY_BATCH_MAX = 64
+
 
 class Orchestrator:
     """Main AI orchestrator that coordinates all components."""
@@ -39,9 +43,13 @@ class Orchestrator:
         self._shared = get_shared_services()
         self.mqtt: MqttService | None = None
         self.engine: DecisionEngine | None = None
-        self._pending_llm_analysis = False  # Prevent overlapping LLM requests
+        # Held while an LLM analysis is in flight to prevent overlapping requests
+        self._pending_llm_lock = threading.Lock()
         self._http_server: uvicorn.Server | None = None
         self._http_thread: threading.Thread | None = None
+        # Telemetry is queued by the MQTT network thread and evaluated on a worker
+        self._telemetry_queue: queue.SimpleQueue[TelemetryMessage | None] = queue.SimpleQueue()
+        self._telemetry_thread: threading.Thread | None = None
 
     @property
     def running(self) -> bool:
@@ -56,7 +64,7 @@ class Orchestrator:
         return self._shared.state.devices
 
     @property
-    def recent_commands(self) -> list[dict]:
+    def recent_commands(self) -> deque[dict]:
         return self._shared.state.recent_commands
 
     @property
@@ -86,6 +94,12 @@ class Orchestrator:
         # Start HTTP API server in background thread
         self._start_http_server()
 
+        # Start telemetry worker before any messages can arrive
+        self._telemetry_thread = threading.Thread(
+            target=self._telemetry_worker, name="telemetry", daemon=True
+        )
+        self._telemetry_thread.start()
+
         # Initialize MQTT client
         self.mqtt = MqttService(
             on_telemetry=self._handle_telemetry,
@@ -109,13 +123,13 @@ class Orchestrator:
 
     def _start_http_server(self):
         """Start the HTTP API server in a background thread."""
-        from .api import app
-
         config = uvicorn.Config(
             app,
             host="0.0.0.0",
             port=HTTP_PORT,
             log_level="info",
+            loop="uvloop",
+            http="httptools",
         )
         self._http_server = uvicorn.Server(config)
 
@@ -138,66 +152,105 @@ class Orchestrator:
             self.mqtt.disconnect()
             self.mqtt.loop_stop()
 
+        if self._telemetry_thread:
+            self._telemetry_queue.put(None)
+            self._telemetry_thread.join(timeout=2.0)
+
         self._shared.close()
 
         logger.info("AI Orchestrator stopped")
 
     def _handle_telemetry(self, telemetry: TelemetryMessage):
-        """Handle incoming telemetry data."""
+        """Queue incoming telemetry so the MQTT network loop never blocks on rules."""
+        self._telemetry_queue.put(telemetry)
+
+    def _telemetry_worker(self):
+        """Drain queued telemetry in batches until the None sentinel arrives."""
+        while True:
+            batch = [self._telemetry_queue.get()]
+            while len(batch) < _TELEMETRY_BATCH_MAX:
+                try:
+                    batch.append(self._telemetry_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for telemetry in batch:
+                if telemetry is None:
+                    return
+                try:
+                    self._process_telemetry(telemetry)
+                except Exception as e:
+                    logger.error(f"Error processing telemetry from {telemetry.device_id}: {e}")
+
+    def _process_telemetry(self, telemetry: TelemetryMessage):
+        """Evaluate rules for one telemetry message and escalate to the LLM if needed."""
         logger.debug(f"Received telemetry from {telemetry.device_id}")
 
         # Evaluate rules (fast, synchronous)
         commands = self.engine.evaluate(telemetry)
 
         # Execute rule-based commands immediately
-        for command in commands:
-            self._execute_command(command)
+        if commands:
+            self._execute_commands(commands)
 
         # Check if we should escalate to LLM (non-blocking)
         if not commands and self.engine.should_escalate_to_llm(telemetry):
-            if self.ollama and self.ollama.is_available() and not self._pending_llm_analysis:
+            if (
+                self.ollama
+                and not self._pending_llm_lock.locked()
+                and self.ollama.is_available()
+                and self._pending_llm_lock.acquire(blocking=False)
+            ):
                 logger.info("Escalating to LLM for analysis (async)")
-                self._pending_llm_analysis = True
-                self.ollama.analyze_async(
-                    telemetry,
-                    self.engine.get_context_summary(),
-                    self.recent_commands,
-                    callback=self._handle_llm_result,
-                )
+                try:
+                    self.ollama.analyze_async(
+                        telemetry,
+                        self.engine.get_context_summary(),
+                        self._recent_commands_snapshot(),
+                        callback=self._handle_llm_result,
+                    )
+                except Exception:
+                    self._pending_llm_lock.release()
+                    raise
 
     def _handle_llm_result(self, command: Command | None):
         """Callback for async LLM analysis results."""
-        self._pending_llm_analysis = False
+        self._pending_llm_lock.release()
         if command:
             logger.info(f"LLM analysis complete, executing command: {command.target}")
-            self._execute_command(command)
+            self._execute_commands((command,))
         else:
             logger.debug("LLM analysis complete, no action needed")
 
-    def _execute_command(self, command: Command):
-        """Execute a command by publishing to MQTT."""
+    def _execute_commands(self, commands: Sequence[Command]):
+        """Execute commands by publishing them to MQTT in one batch."""
         if not self.mqtt:
             logger.error("MQTT not connected, cannot execute command")
             return
 
-        correlation_id = self.mqtt.publish_command(command)
-        logger.info(f"Executed command {correlation_id}: {command.target} = {command.value}")
+        correlation_ids = self.mqtt.publish_commands(commands)
+        now = time.time()
+
+        for command, correlation_id in zip(commands, correlation_ids):
+            logger.info(f"Executed command {correlation_id}: {command.target} = {command.value}")
 
-        # Track recent commands
-        self.recent_commands.append({
-            "correlation_id": correlation_id,
-            "target": command.target,
-            "action": command.action,
-            "value": command.value,
-            "reason": command.reason,
-            "ts": time.time(),
-        })
+            # Track recent commands
+            self.recent_commands.append({
+                "correlation_id": correlation_id,
+                "target": command.target,
+                "action": command.action,
+                "value": command.value,
+                "reason": command.reason,
+                "ts": now,
+            })
 
-        # Keep only last 5 minutes of commands
+    def _recent_commands_snapshot(self) -> list[dict]:
+        """Drop commands older than 5 minutes and return a copy of the rest."""
         cutoff = time.time() - 300
-        self._shared.state.recent_commands[:] = [
-            c for c in self.recent_commands if c["ts"] > cutoff
-        ]
+        commands = self.recent_commands
+        while commands and commands[0]["ts"] <= cutoff:
+            commands.popleft()
+        return list(commands)
 
     def _handle_ack(self, ack: CommandAck):
         """Handle command acknowledgment."""
@@ -1,10 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 import uuid
 import time
 
 
-@dataclass
+@dataclass(slots=True)
 class Command:
     """A command to send to a device."""
     device_id: str
@@ -15,37 +15,48 @@ class Command:
     reason: str | None = None
     ttl: int = 30000
     correlation_id: str | None = None
+    _topic: str = field(init=False, repr=False, compare=False)
+    _envelope: dict[str, Any] | None = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if self.correlation_id is None:
             self.correlation_id = f"ai-{uuid.uuid4().hex[:8]}"
+        self._topic = f"home/{self.location}/{self.device_id}/command"
 
     def to_mqtt_payload(self) -> dict[str, Any]:
-        """Convert to MQTT message envelope."""
-        return {
-            "v": 1,
-            "ts": int(time.time() * 1000),
-            "correlationId": self.correlation_id,
-            "source": "ai-orchestrator",
-            "deviceId": self.device_id,
-            "location": self.location,
-            "type": "command",
-            "payload": {
-                "target": self.target,
-                "action": self.action,
-                "value": self.value,
-                "reason": self.reason,
-                "ttl": self.ttl
+        """
+        Convert to MQTT message envelope.
+        The envelope is built once and reused with a fresh timestamp; callers
+        serialize it immediately and must not mutate it.
+        """
+        envelope = self._envelope
+        if envelope is None:
+            envelope = self._envelope = {
+                "v": 1,
+                "ts": 0,
+                "correlationId": self.correlation_id,
+                "source": "ai-orchestrator",
+                "deviceId": self.device_id,
+                "location": self.location,
+                "type": "command",
+                "payload": {
+                    "target": self.target,
+                    "action": self.action,
+                    "value": self.value,
+                    "reason": self.reason,
+                    "ttl": self.ttl
+                }
             }
-        }
+        envelope["ts"] = time.time_ns() // 1_000_000
+        return envelope
 
     @property
     def topic(self) -> str:
         """Get the MQTT topic for this command."""
-        return f"home/{self.location}/{self.device_id}/command"
+        return self._topic
 
 
-@dataclass
+@dataclass(slots=True)
 class CommandAck:
     """Acknowledgment from a device."""
     correlation_id: str
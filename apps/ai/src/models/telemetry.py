@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class Reading:
     """A single sensor reading."""
     id: str
@@ -10,7 +10,7 @@ class Reading:
     unit: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TelemetryMessage:
     """Telemetry message from a device."""
     version: int
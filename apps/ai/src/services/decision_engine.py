@@ -1,19 +1,40 @@
 import logging
+import operator
 import time
+from sys import intern
 from dataclasses import dataclass, field
-from typing import Any
+from functools import lru_cache
+from typing import Any, Callable, Sequence
 from pathlib import Path
 
 import yaml
 
+try:
+    # libyaml C parser when PyYAML was built with it
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 from ..models.telemetry import TelemetryMessage
 from ..models.command import Command
 from ..config import DEFAULT_DEVICE_ID, DEFAULT_LOCATION
 
 logger = logging.getLogger(__name__)
 
+# Shared empty result for the common case where no rule fires
+_NO_COMMANDS: tuple[Command, ...] = ()
 
-@dataclass
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+@dataclass(frozen=True, slots=True)
 class RuleCondition:
     """A condition that must be met for a rule to trigger."""
     sensor: str
@@ -21,8 +42,40 @@ class RuleCondition:
     threshold: float | str
     duration_seconds: int = 0
 
+    def compile(self) -> Callable[[Any], bool]:
+        """
+        Build a predicate for this condition with the operator and threshold bound.
+        Numeric thresholds compare numerically against numeric values; == and !=
+        fall back to string comparison otherwise. Anything else never matches.
+        """
+        compare = _OPERATORS.get(self.operator)
+        threshold = self.threshold
+        is_equality = self.operator in ("==", "!=")
 
-@dataclass
+        if compare is None:
+            return lambda value: False
+
+        if isinstance(threshold, (int, float)):
+            if is_equality:
+                threshold_str = str(threshold)
+
+                def check(value: Any) -> bool:
+                    if isinstance(value, (int, float)):
+                        return compare(value, threshold)
+                    return compare(str(value), threshold_str)
+
+                return check
+
+            return lambda value: isinstance(value, (int, float)) and compare(value, threshold)
+
+        if is_equality:
+            threshold_str = str(threshold)
+            return lambda value: compare(str(value), threshold_str)
+
+        return lambda value: False
+
+
+@dataclass(frozen=True, slots=True)
 class RuleAction:
     """An action to take when a rule triggers."""
     target: str
@@ -31,191 +84,192 @@ class RuleAction:
     reason: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Rule:
-    """A rule that maps conditions to actions."""
+    """
+    A rule that maps conditions to actions.
+
+    Frozen because _load_rules() caches parsed rules and every engine loaded
+    from the same unchanged file shares the same instances.
+    """
     name: str
     description: str
     condition: RuleCondition
     action: RuleAction
     enabled: bool = True
+    check: Callable[[Any], bool] = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self):
+        object.__setattr__(self, "check", self.condition.compile())
 
-@dataclass
+
+@dataclass(slots=True)
 class SensorState:
     """Track state for a sensor to handle duration-based rules."""
     last_value: float | str | None = None
+    # Monotonic timestamps; last_action_time is None until the rule first fires
     condition_met_since: float | None = None
-    last_action_time: float = 0
+    last_action_time: float | None = None
     cooldown_seconds: float = 60  # Prevent rapid toggling
 
 
+@lru_cache(maxsize=4)
+def _load_rules(path: str, mtime_ns: int) -> tuple[tuple[Rule, ...], dict[str, Any]]:
+    """Parse a rules file. Keyed on mtime so an edited file is re-read."""
+    logger.debug(f"Parsing {path} with {_YamlLoader.__name__}")
+    with open(path) as f:
+        config = yaml.load(f, Loader=_YamlLoader)
+
+    rules = []
+    for rule_data in config.get("rules", []):
+        condition_data = rule_data.get("condition", {})
+        action_data = rule_data.get("action", {})
+
+        rule = Rule(
+            name=intern(rule_data.get("name", "")),
+            description=rule_data.get("description", ""),
+            condition=RuleCondition(
+                sensor=intern(condition_data.get("sensor", "")),
+                operator=intern(condition_data.get("operator", ">")),
+                threshold=condition_data.get("threshold", 0),
+                duration_seconds=condition_data.get("duration_seconds", 0),
+            ),
+            action=RuleAction(
+                target=intern(action_data.get("target", "")),
+                action=intern(action_data.get("action", "set")),
+                value=action_data.get("value"),
+                reason=action_data.get("reason", ""),
+            ),
+            enabled=rule_data.get("enabled", True),
+        )
+        rules.append(rule)
+        logger.info(f"Loaded rule: {rule.name}")
+
+    llm_config = config.get("llm", {})
+
+    return tuple(rules), llm_config
+
+
 @dataclass
 class DecisionEngine:
     """Rule-based decision engine for sensor data."""
     rules: list[Rule] = field(default_factory=list)
-    sensor_states: dict[str, SensorState] = field(default_factory=dict)
+    # Keyed by (device_id, sensor, rule name)
+    sensor_states: dict[tuple[str, str, str], SensorState] = field(default_factory=dict)
     llm_config: dict[str, Any] = field(default_factory=dict)
+    # Enabled rules grouped by the sensor they watch, in file order
+    _rules_by_sensor: dict[str, list[Rule]] = field(init=False, repr=False, default_factory=dict)
+    # Rapid-change escalation: threshold (None when disabled) and last temp1 per device
+    _rapid_change_threshold: float | None = field(init=False, repr=False, default=None)
+    _last_temp: dict[str, float] = field(init=False, repr=False, default_factory=dict)
+
+    def __post_init__(self):
+        for rule in self.rules:
+            if rule.enabled:
+                self._rules_by_sensor.setdefault(rule.condition.sensor, []).append(rule)
+
+        triggers = self.llm_config.get("escalation_triggers", {})
+        if self.llm_config.get("enabled", False) and "rapid_change" in triggers:
+            self._rapid_change_threshold = triggers["rapid_change"]
 
     @classmethod
     def from_yaml(cls, path: str | Path) -> "DecisionEngine":
-        """Load rules from a YAML config file."""
-        with open(path) as f:
-            config = yaml.safe_load(f)
-
-        rules = []
-        for rule_data in config.get("rules", []):
-            condition_data = rule_data.get("condition", {})
-            action_data = rule_data.get("action", {})
-
-            rule = Rule(
-                name=rule_data.get("name", ""),
-                description=rule_data.get("description", ""),
-                condition=RuleCondition(
-                    sensor=condition_data.get("sensor", ""),
-                    operator=condition_data.get("operator", ">"),
-                    threshold=condition_data.get("threshold", 0),
-                    duration_seconds=condition_data.get("duration_seconds", 0),
-                ),
-                action=RuleAction(
-                    target=action_data.get("target", ""),
-                    action=action_data.get("action", "set"),
-                    value=action_data.get("value"),
-                    reason=action_data.get("reason", ""),
-                ),
-                enabled=rule_data.get("enabled", True),
-            )
-            rules.append(rule)
-            logger.info(f"Loaded rule: {rule.name}")
-
-        llm_config = config.get("llm", {})
-
-        return cls(rules=rules, llm_config=llm_config)
-
-    def evaluate(self, telemetry: TelemetryMessage) -> list[Command]:
+        """Load rules from a YAML config file (parsed once per file modification)."""
+        path = Path(path)
+        rules, llm_config = _load_rules(str(path), path.stat().st_mtime_ns)
+        return cls(rules=list(rules), llm_config=dict(llm_config))
+
+    def evaluate(self, telemetry: TelemetryMessage) -> Sequence[Command]:
         """Evaluate rules against telemetry data. Returns commands to execute."""
-        commands = []
-        now = time.time()
+        readings = {r.id: r for r in telemetry.readings}
+        if readings.keys().isdisjoint(self._rules_by_sensor):
+            return _NO_COMMANDS
 
-        for rule in self.rules:
-            if not rule.enabled:
-                continue
+        commands: list[Command] = []
+        now = time.monotonic()
 
-            # Get sensor reading
-            reading = telemetry.get_reading(rule.condition.sensor)
+        for sensor, rules in self._rules_by_sensor.items():
+            reading = readings.get(sensor)
             if reading is None:
                 continue
 
-            # Get or create sensor state
-            state_key = f"{telemetry.device_id}:{rule.condition.sensor}:{rule.name}"
-            if state_key not in self.sensor_states:
-                self.sensor_states[state_key] = SensorState()
-            state = self.sensor_states[state_key]
-
-            # Check if condition is met
-            condition_met = self._check_condition(reading.value, rule.condition)
-
-            if condition_met:
-                # Track when condition started being met
-                if state.condition_met_since is None:
-                    state.condition_met_since = now
-                    logger.debug(f"Rule {rule.name}: condition started")
-
-                # Check if duration requirement is met
-                duration_met = (now - state.condition_met_since) >= rule.condition.duration_seconds
-
-                # Check cooldown
-                cooldown_ok = (now - state.last_action_time) >= state.cooldown_seconds
-
-                if duration_met and cooldown_ok:
-                    command = Command(
-                        device_id=telemetry.device_id,
-                        location=telemetry.location,
-                        target=rule.action.target,
-                        action=rule.action.action,
-                        value=rule.action.value,
-                        reason=rule.action.reason,
+            for rule in rules:
+                # Get or create sensor state
+                state_key = (telemetry.device_id, sensor, rule.name)
+                state = self.sensor_states.get(state_key)
+                if state is None:
+                    state = self.sensor_states[state_key] = SensorState()
+
+                # Check if condition is met
+                condition_met = rule.check(reading.value)
+
+                if condition_met:
+                    # Track when condition started being met
+                    if state.condition_met_since is None:
+                        state.condition_met_since = now
+                        logger.debug(f"Rule {rule.name}: condition started")
+
+                    # Check if duration requirement is met
+                    duration_met = (now - state.condition_met_since) >= rule.condition.duration_seconds
+
+                    # Check cooldown
+                    cooldown_ok = (
+                        state.last_action_time is None
+                        or (now - state.last_action_time) >= state.cooldown_seconds
                     )
-                    commands.append(command)
-                    state.last_action_time = now
-                    logger.info(f"Rule {rule.name} triggered: {rule.action.reason}")
-            else:
-                # Reset condition tracking
-                if state.condition_met_since is not None:
-                    logger.debug(f"Rule {rule.name}: condition no longer met")
-                state.condition_met_since = None
-
-            state.last_value = reading.value
-
-        return commands
-
-    def _check_condition(self, value: float | str, condition: RuleCondition) -> bool:
-        """Check if a value meets a condition."""
-        try:
-            # Handle numeric comparisons
-            if isinstance(value, (int, float)) and isinstance(condition.threshold, (int, float)):
-                if condition.operator == ">":
-                    return value > condition.threshold
-                elif condition.operator == "<":
-                    return value < condition.threshold
-                elif condition.operator == ">=":
-                    return value >= condition.threshold
-                elif condition.operator == "<=":
-                    return value <= condition.threshold
-                elif condition.operator == "==":
-                    return value == condition.threshold
-                elif condition.operator == "!=":
-                    return value != condition.threshold
-
-            # Handle string comparisons
-            if condition.operator == "==":
-                return str(value) == str(condition.threshold)
-            elif condition.operator == "!=":
-                return str(value) != str(condition.threshold)
-
-        except (TypeError, ValueError) as e:
-            logger.error(f"Error evaluating condition: {e}")
 
-        return False
+                    if duration_met and cooldown_ok:
+                        command = Command(
+                            device_id=telemetry.device_id,
+                            location=telemetry.location,
+                            target=rule.action.target,
+                            action=rule.action.action,
+                            value=rule.action.value,
+                            reason=rule.action.reason,
+                        )
+                        commands.append(command)
+                        state.last_action_time = now
+                        logger.info(f"Rule {rule.name} triggered: {rule.action.reason}")
+                else:
+                    # Reset condition tracking
+                    if state.condition_met_since is not None:
+                        logger.debug(f"Rule {rule.name}: condition no longer met")
+                    state.condition_met_since = None
+
+                state.last_value = reading.value
+
+        return commands or _NO_COMMANDS
 
     def should_escalate_to_llm(self, telemetry: TelemetryMessage) -> bool:
         """Check if the situation should be escalated to the LLM."""
-        if not self.llm_config.get("enabled", False):
+        threshold = self._rapid_change_threshold
+        if threshold is None:
             return False
 
-        triggers = self.llm_config.get("escalation_triggers", {})
-
         # Check for rapid temperature change
-        if "rapid_change" in triggers:
-            state_key = f"{telemetry.device_id}:temp1:_rapid"
-            if state_key not in self.sensor_states:
-                self.sensor_states[state_key] = SensorState()
-            state = self.sensor_states[state_key]
-
-            reading = telemetry.get_reading("temp1")
-            if reading and state.last_value is not None:
-                change = abs(float(reading.value) - float(state.last_value))
-                # Assuming telemetry every 5 seconds, scale to per-minute
-                change_per_minute = change * 12
-                if change_per_minute > triggers["rapid_change"]:
-                    logger.info(f"LLM escalation: rapid temp change {change_per_minute:.1f}°C/min")
-                    return True
-            if reading:
-                state.last_value = reading.value
+        reading = telemetry.get_reading("temp1")
+        if reading is None:
+            return False
+
+        value = float(reading.value)
+        previous = self._last_temp.get(telemetry.device_id)
+        self._last_temp[telemetry.device_id] = value
+        if previous is None:
+            return False
 
+        # Assuming telemetry every 5 seconds, scale to per-minute
+        change_per_minute = abs(value - previous) * 12
+        if change_per_minute > threshold:
+            logger.info(f"LLM escalation: rapid temp change {change_per_minute:.1f}°C/min")
+            return True
         return False
 
     def get_context_summary(self) -> dict[str, Any]:
         """Get a summary of current sensor states for LLM context."""
         summary = {}
-        for key, state in self.sensor_states.items():
-            parts = key.split(":")
-            if len(parts) >= 2:
-                device_id, sensor = parts[0], parts[1]
-                if device_id not in summary:
-                    summary[device_id] = {}
-                summary[device_id][sensor] = {
-                    "last_value": state.last_value,
-                    "condition_active": state.condition_met_since is not None,
-                }
+        for (device_id, sensor, _), state in self.sensor_states.items():
+            summary.setdefault(device_id, {})[sensor] = {
+                "last_value": state.last_value,
+                "condition_active": state.condition_met_since is not None,
+            }
         return summary
@@ -1,8 +1,8 @@
-import json
 import logging
 import time
-from typing import Callable, Any
+from typing import Callable, Any, Sequence
 
+import orjson
 import paho.mqtt.client as mqtt
 
 from ..config import MQTT_HOST, MQTT_PORT, MQTT_USERNAME, MQTT_PASSWORD
@@ -11,6 +11,19 @@ from ..models.command import Command, CommandAck
 
 logger = logging.getLogger(__name__)
 
+# Subscriptions (including legacy format for backward compatibility)
+_SUBSCRIPTIONS: tuple[tuple[str, int], ...] = (
+    ("home/+/+/telemetry", 0),
+    ("home/+/+/ack", 0),
+    ("home/_registry/+/birth", 0),
+    ("home/_registry/+/will", 0),
+    ("/device/+/telemetry", 0),  # Legacy topic format
+)
+_SUBSCRIPTIONS_LOG = f"Subscribed to: {[topic for topic, _ in _SUBSCRIPTIONS]}"
+
+# Only the legacy subscription (/device/+/telemetry) has a leading slash
+_LEGACY_PREFIX = "/device/"
+
 
 class MqttService:
     """MQTT client for the AI orchestrator."""
@@ -32,6 +45,13 @@ class MqttService:
         self._on_device_offline = on_device_offline
         self._connected = False
         self._pending_commands: dict[str, Command] = {}
+        # Envelope "type" -> handler
+        self._handlers: dict[str, Callable[[dict[str, Any]], None]] = {
+            "telemetry": self._handle_telemetry,
+            "ack": self._handle_ack,
+            "birth": self._handle_birth,
+            "will": self._handle_will,
+        }
 
         # Set up callbacks
         self.client.on_connect = self._on_connect
@@ -65,11 +85,22 @@ class MqttService:
 
     def publish_command(self, command: Command) -> str:
         """Publish a command to a device. Returns correlation ID."""
-        payload = json.dumps(command.to_mqtt_payload())
-        self.client.publish(command.topic, payload, qos=1)
-        self._pending_commands[command.correlation_id] = command
-        logger.info(f"Published command {command.correlation_id} to {command.topic}")
-        return command.correlation_id
+        return self.publish_commands((command,))[0]
+
+    def publish_commands(self, commands: Sequence[Command]) -> list[str]:
+        """
+        Publish several commands back to back. Returns correlation IDs in order.
+        All payloads are encoded before the first publish so the QoS 1 packets
+        go out in one burst.
+        """
+        encoded = [(c.topic, orjson.dumps(c.to_mqtt_payload())) for c in commands]
+        publish = self.client.publish
+        for topic, payload in encoded:
+            publish(topic, payload, qos=1)
+        self._pending_commands.update((c.correlation_id, c) for c in commands)
+        correlation_ids = [c.correlation_id for c in commands]
+        logger.info(f"Published {len(commands)} commands: {correlation_ids}")
+        return correlation_ids
 
     def _on_connect(self, client, userdata, flags, reason_code, properties) -> None:
         """Handle MQTT connection."""
@@ -77,16 +108,9 @@ class MqttService:
             logger.info("Connected to MQTT broker")
             self._connected = True
 
-            # Subscribe to topics (including legacy format for backward compatibility)
-            topics = [
-                ("home/+/+/telemetry", 0),
-                ("home/+/+/ack", 0),
-                ("home/_registry/+/birth", 0),
-                ("home/_registry/+/will", 0),
-                ("/device/+/telemetry", 0),  # Legacy topic format
-            ]
-            self.client.subscribe(topics)
-            logger.info(f"Subscribed to: {[t[0] for t in topics]}")
+            # paho treats a tuple as a single (topic, qos) pair; pass a list for one SUBSCRIBE
+            self.client.subscribe(list(_SUBSCRIPTIONS))
+            logger.info(_SUBSCRIPTIONS_LOG)
         else:
             logger.error(f"Failed to connect: {reason_code}")
 
@@ -98,29 +122,23 @@ class MqttService:
     def _on_message(self, client, userdata, msg: mqtt.MQTTMessage) -> None:
         """Handle incoming MQTT messages."""
         try:
-            payload = json.loads(msg.payload.decode("utf-8"))
+            payload = orjson.loads(msg.payload)
             topic = msg.topic
 
             # Check for legacy format: /device/{device_id}/telemetry
-            if topic.startswith("/device/") and topic.endswith("/telemetry"):
+            if topic.startswith(_LEGACY_PREFIX):
                 self._handle_legacy_telemetry(topic, payload)
                 return
 
-            # Parse message type from envelope
+            # Dispatch on message type from envelope
             msg_type = payload.get("type")
-
-            if msg_type == "telemetry":
-                self._handle_telemetry(payload)
-            elif msg_type == "ack":
-                self._handle_ack(payload)
-            elif msg_type == "birth":
-                self._handle_birth(payload)
-            elif msg_type == "will":
-                self._handle_will(payload)
-            else:
+            handler = self._handlers.get(msg_type)
+            if handler is None:
                 logger.debug(f"Unknown message type: {msg_type} on {topic}")
+                return
+            handler(payload)
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse MQTT message: {e}")
         except Exception as e:
             logger.error(f"Error handling MQTT message: {e}")
@@ -152,7 +170,7 @@ class MqttService:
         # Create envelope-style payload for TelemetryMessage
         converted = {
             "v": 1,
-            "ts": payload.get("ts", int(time.time() * 1000)),
+            "ts": payload.get("ts", time.time_ns() // 1_000_000),
             "deviceId": device_id,
             "location": "unknown",  # Legacy format doesn't include location
             "type": "telemetry",
@@ -1,18 +1,19 @@
+import hashlib
 import logging
+import queue
+import threading
+from collections import OrderedDict
 from typing import Any, Callable
-from concurrent.futures import ThreadPoolExecutor
 
 import httpx
+import orjson
 
-from ..config import OLLAMA_URL, OLLAMA_MODEL
+from ..config import OLLAMA_URL, OLLAMA_MODEL, OLLAMA_CACHE_SIZE
 from ..models.telemetry import TelemetryMessage
 from ..models.command import Command
 
 logger = logging.getLogger(__name__)
 
-# Thread pool for non-blocking LLM calls
-_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ollama-")
-
 SYSTEM_PROMPT = """You are an AI assistant controlling a smart home IoT system.
 You receive sensor data and must decide what actions to take.
 
@@ -31,14 +32,59 @@ Be conservative - only take action when clearly necessary.
 Consider comfort, energy efficiency, and avoiding rapid state changes.
 """
 
+# JSON schema for Ollama structured outputs; constrains decoding to the formats above
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "action": {"type": "string", "enum": ["command", "none"]},
+        "target": {"type": "string"},
+        "value": {"type": "boolean"},
+        "reason": {"type": "string"},
+    },
+    "required": ["action", "reason"],
+}
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _prompt_value(value: Any) -> Any:
+    """Round float sensor values to 0.1 so jitter doesn't defeat the response cache."""
+    return round(value, 1) if isinstance(value, float) else value
+
 
 class OllamaClient:
     """Client for interacting with Ollama LLM."""
 
-    def __init__(self, base_url: str = OLLAMA_URL, model: str = OLLAMA_MODEL):
+    def __init__(
+        self,
+        base_url: str = OLLAMA_URL,
+        model: str = OLLAMA_MODEL,
+        cache_size: int = OLLAMA_CACHE_SIZE,
+    ):
         self.base_url = base_url.rstrip("/")
         self.model = model
-        self._client = httpx.Client(timeout=60.0)
+        # Constant part of every analysis request; analyze() adds only the prompt
+        self._analysis_payload = {
+            "model": model,
+            "system": SYSTEM_PROMPT,
+            "stream": False,
+            "format": ANALYSIS_SCHEMA,
+        }
+        # Keep connections warm across analyze/generate calls; fail fast if Ollama is down
+        self._client = httpx.Client(
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=4, max_connections=8, keepalive_expiry=120.0),
+        )
+        # LRU of response text keyed by a hash of the full request payload
+        self._cache: OrderedDict[bytes, str] = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Single pending analysis slot; a newer request replaces a stale one
+        self._requests: queue.Queue[tuple | None] = queue.Queue(maxsize=1)
+        self._worker = threading.Thread(target=self._run_worker, name="ollama-worker", daemon=True)
+        self._worker.start()
 
     def is_available(self) -> bool:
         """Check if Ollama is available."""
@@ -62,20 +108,7 @@ class OllamaClient:
         prompt = self._build_prompt(telemetry, context, recent_commands)
 
         try:
-            response = self._client.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "system": SYSTEM_PROMPT,
-                    "stream": False,
-                    "format": "json",
-                },
-            )
-            response.raise_for_status()
-
-            result = response.json()
-            response_text = result.get("response", "")
+            response_text = self._generate_cached({**self._analysis_payload, "prompt": prompt})
             logger.debug(f"LLM response: {response_text}")
 
             return self._parse_response(response_text, telemetry)
@@ -96,7 +129,8 @@ class OllamaClient:
         """Build the prompt for the LLM."""
         # Format current readings
         readings_str = "\n".join(
-            f"  - {r.id}: {r.value}{' ' + r.unit if r.unit else ''}"
+            f"  - {r.id}: {_prompt_value(r.value)}"
+            f"{' ' + r.unit if r.unit else ''}"
             for r in telemetry.readings
         )
 
@@ -107,7 +141,7 @@ class OllamaClient:
                 context_str += f"\nDevice {device_id}:\n"
                 for sensor, state in sensors.items():
                     if state.get("last_value") is not None:
-                        context_str += f"  - {sensor}: last={state['last_value']}, condition_active={state.get('condition_active', False)}\n"
+                        context_str += f"  - {sensor}: last={_prompt_value(state['last_value'])}, condition_active={state.get('condition_active', False)}\n"
 
         # Format recent commands
         commands_str = ""
@@ -133,27 +167,21 @@ Respond with JSON only."""
 
     def _parse_response(self, response_text: str, telemetry: TelemetryMessage) -> Command | None:
         """Parse the LLM response into a Command."""
-        import json
+        # Schema-constrained output is always valid JSON; decode errors surface in analyze()
+        data = orjson.loads(response_text)
+
+        if data.get("action") == "command":
+            return Command(
+                device_id=telemetry.device_id,
+                location=telemetry.location,
+                target=data.get("target", "relay1"),
+                action="set",
+                value=data.get("value", False),
+                reason=f"[AI] {data.get('reason', 'LLM decision')}",
+            )
 
-        try:
-            data = json.loads(response_text)
-
-            if data.get("action") == "command":
-                return Command(
-                    device_id=telemetry.device_id,
-                    location=telemetry.location,
-                    target=data.get("target", "relay1"),
-                    action="set",
-                    value=data.get("value", False),
-                    reason=f"[AI] {data.get('reason', 'LLM decision')}",
-                )
-            else:
-                logger.debug(f"LLM decided no action: {data.get('reason', 'no reason')}")
-                return None
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response as JSON: {e}")
-            return None
+        logger.debug(f"LLM decided no action: {data.get('reason', 'no reason')}")
+        return None
 
     def analyze_async(
         self,
@@ -164,26 +192,53 @@ Respond with JSON only."""
     ) -> None:
         """
         Non-blocking version of analyze.
-        Submits the analysis to a thread pool and calls callback(command) when done.
+        Queues the analysis for the worker thread and calls callback(command) when done.
+        If an older request is still waiting it is dropped and its callback gets None.
         """
-        def _run():
+        self._submit((telemetry, context, recent_commands, callback))
+        logger.debug("LLM analysis queued for worker")
+
+    def _submit(self, item: tuple | None) -> None:
+        """Put an item in the request slot, evicting any request still waiting."""
+        while True:
+            try:
+                self._requests.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    stale = self._requests.get_nowait()
+                except queue.Empty:
+                    continue
+                if stale is not None:
+                    logger.debug("Dropping stale LLM analysis request")
+                    stale_callback = stale[3]
+                    if stale_callback:
+                        stale_callback(None)
+
+    def _run_worker(self) -> None:
+        """Run queued analyses one at a time until the None sentinel arrives."""
+        while True:
+            item = self._requests.get()
+            if item is None:
+                return
+            telemetry, context, recent_commands, callback = item
             try:
                 command = self.analyze(telemetry, context, recent_commands)
-                if callback:
-                    callback(command)
             except Exception as e:
                 logger.error(f"Async LLM analysis failed: {e}")
-                if callback:
-                    callback(None)
-
-        _executor.submit(_run)
-        logger.debug("LLM analysis submitted to thread pool")
+                command = None
+            # Invoke exactly once, outside the try, so a failing callback isn't re-run
+            if callback:
+                try:
+                    callback(command)
+                except Exception as e:
+                    logger.error(f"LLM analysis callback failed: {e}")
 
     def generate(
         self,
         prompt: str,
         system: str | None = None,
-        format: str | None = "json",
+        format: str | dict[str, Any] | None = "json",
     ) -> str:
         """
         Generate a response from the LLM.
@@ -193,7 +248,7 @@ Respond with JSON only."""
         Args:
             prompt: The user prompt
             system: Optional system prompt
-            format: Response format ("json" or None for free text)
+            format: Response format ("json", a JSON schema dict, or None for free text)
 
         Returns:
             The raw response text from the LLM
@@ -209,13 +264,7 @@ Respond with JSON only."""
             if format:
                 payload["format"] = format
 
-            response = self._client.post(
-                f"{self.base_url}/api/generate",
-                json=payload,
-            )
-            response.raise_for_status()
-            result = response.json()
-            return result.get("response", "")
+            return self._generate_cached(payload)
 
         except httpx.HTTPError as e:
             logger.error(f"Ollama HTTP error in generate: {e}")
@@ -224,6 +273,35 @@ Respond with JSON only."""
             logger.error(f"Ollama error in generate: {e}")
             raise
 
+    def _generate_cached(self, payload: dict[str, Any]) -> str:
+        """POST to /api/generate, answering repeated identical payloads from the LRU."""
+        # Sorted keys make the body canonical, so it doubles as the cache key input
+        body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        key = hashlib.blake2b(body, digest_size=16).digest()
+
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+
+        response = self._client.post(
+            f"{self.base_url}/api/generate", content=body, headers=_JSON_HEADERS
+        )
+        response.raise_for_status()
+        text = orjson.loads(response.content).get("response", "")
+
+        if self._cache_size > 0:
+            with self._cache_lock:
+                self._cache[key] = text
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return text
+
     def close(self):
-        """Close the HTTP client."""
+        """Stop the worker and close the HTTP client."""
+        self._submit(None)
+        self._worker.join(timeout=2.0)
         self._client.close()
@@ -6,6 +6,8 @@ to be shared across components (e.g., between main.py orchestrator and api.py HT
 """
 
 import logging
+import threading
+from collections import deque
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
@@ -14,13 +16,16 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Commands only matter for the 5-minute LLM context window; cap memory regardless
+RECENT_COMMANDS_MAX = 256
+
 
 @dataclass
 class SharedState:
     """Shared application state across components."""
     running: bool = False
     devices: dict = field(default_factory=dict)
-    recent_commands: list = field(default_factory=list)
+    recent_commands: deque = field(default_factory=lambda: deque(maxlen=RECENT_COMMANDS_MAX))
 
 
 class SharedServices:
@@ -31,21 +36,11 @@ class SharedServices:
     once, and have them accessible from the HTTP API endpoints (api.py).
     """
 
-    _instance: "SharedServices | None" = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
-
     def __init__(self):
-        if self._initialized:
-            return
-
         self.state = SharedState()
         self._ollama: "OllamaClient | None" = None
-        self._initialized = True
+        # Guards init_ollama so concurrent callers can't build two clients
+        self._ollama_lock = threading.Lock()
         logger.debug("SharedServices initialized")
 
     @property
@@ -70,21 +65,28 @@ class SharedServices:
         from ..config import OLLAMA_URL, OLLAMA_MODEL
         from .ollama_client import OllamaClient
 
-        self._ollama = OllamaClient(
-            base_url=base_url or OLLAMA_URL,
-            model=model or OLLAMA_MODEL,
-        )
-        logger.info(f"Ollama client initialized: {self._ollama.base_url} ({self._ollama.model})")
-        return self._ollama
+        with self._ollama_lock:
+            if self._ollama is None:
+                self._ollama = OllamaClient(
+                    base_url=base_url or OLLAMA_URL,
+                    model=model or OLLAMA_MODEL,
+                )
+                logger.info(f"Ollama client initialized: {self._ollama.base_url} ({self._ollama.model})")
+            return self._ollama
 
     def close(self):
         """Clean up shared resources."""
-        if self._ollama:
-            self._ollama.close()
-            self._ollama = None
+        with self._ollama_lock:
+            ollama, self._ollama = self._ollama, None
+        if ollama:
+            ollama.close()
         logger.debug("SharedServices closed")
 
 
+# Created at import, so lookups are a plain global read with no locking
+_shared = SharedServices()
+
+
 def get_shared_services() -> SharedServices:
     """Get the shared services singleton."""
-    return SharedServices()
+    return _shared
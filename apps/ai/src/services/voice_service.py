@@ -2,21 +2,47 @@
 Voice processing service using Vosk (STT) and Kokoro (TTS).
 """
 
+import hashlib
 import io
 import json
 import logging
+import os
+import queue
 import re
+import struct
+import threading
 import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from math import gcd
 from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
 
 import numpy as np
 import soundfile as sf
 
 logger = logging.getLogger(__name__)
 
+# Read size when streaming uploads into Vosk
+_STREAM_CHUNK_BYTES = 64 * 1024
+
+# Leading bytes of the compressed containers browsers record: webm (EBML), ogg
+_COMPRESSED_MAGICS = frozenset((b"\x1a\x45\xdf\xa3", b"OggS"))
+
+# Size of the canonical PCM RIFF header written by wav_header()
+_WAV_HEADER_SIZE = 44
+
+# Chunks synthesized concurrently. ONNX Runtime releases the GIL during
+# inference and kokoro_onnx serializes only the espeak phonemizer.
+_CHUNK_WORKERS = 4
+_chunk_executor = ThreadPoolExecutor(max_workers=_CHUNK_WORKERS, thread_name_prefix="kokoro-")
+
 # Lazy imports for optional dependencies
 _vosk = None
 _kokoro = None
+_resample_poly = None  # False once scipy is known to be missing
+_av = None  # False once PyAV is known to be missing
 
 # Number word tables for text normalization
 _ONES = [
@@ -27,6 +53,7 @@ _ONES = [
 _TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
 
 
+@lru_cache(maxsize=2048)
 def _num_to_words(n: int) -> str:
     """Convert an integer (0–999,999,999) to English words."""
     if n == 0:
@@ -51,6 +78,195 @@ def _num_to_words(n: int) -> str:
     return " ".join(parts)
 
 
+# --- TTS text normalization (see VoiceService._clean_text_for_tts) ---
+
+_EMOJI_CHARS = (
+    "\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF"
+    "\U0001F1E0-\U0001F1FF\U00002702-\U000027B0\U000024C2-\U0001F251"
+    "\U0001F900-\U0001F9FF\U0001FA00-\U0001FA6F\U0001FA70-\U0001FAFF"
+    "\U00002600-\U000026FF\U00002700-\U000027BF"
+)
+_EMOJI_RE = re.compile(f"[{_EMOJI_CHARS}]+", flags=re.UNICODE)
+
+# Arrows and symbols, each replaced by a space
+_SYMBOL_CHARS = r"→←↑↓↔↕⇒⇐⇑⇓⇔⇕➔➜➡➤►▶◄◀•●○◦▪▫★☆✓✗✔✘|~`^"
+_SYMBOL_RE = re.compile(f"[{_SYMBOL_CHARS}]")
+
+# Any character one of the passes below can act on. Text without one (most
+# plain LLM prose) only needs its whitespace collapsed.
+_NEEDS_CLEAN_RE = re.compile(f"[{_EMOJI_CHARS}{_SYMBOL_CHARS}\\d°$£€%*_:]")
+
+# Markdown formatting, applied in order: **bold**, *italic*, __underline__, _italic_, `code`
+_MARKDOWN_RES = (
+    re.compile(r"\*\*([^*]+)\*\*"),
+    re.compile(r"\*([^*]+)\*"),
+    re.compile(r"__([^_]+)__"),
+    re.compile(r"_([^_]+)_"),
+    re.compile(r"`([^`]+)`"),
+)
+
+_CELSIUS_RE = re.compile(r"°C\b")
+_FAHRENHEIT_RE = re.compile(r"°F\b")
+# Every numeric form in one alternation, tried in priority order at each position
+# so the text is scanned once. The outer group name selects the expander.
+_NUMERIC_RE = re.compile(
+    # H:MM or HH:MM with optional seconds and AM/PM
+    r"(?P<time>\b(?P<hour>\d{1,2}):(?P<minute>\d{2})(?::\d{2})?\s*(?P<period>AM|PM|am|pm|A\.M\.|P\.M\.)?\b)"
+    r"|(?P<currency>(?P<symbol>[$£€])(?P<units>\d+)(?:\.(?P<cents>\d{2}))?\b)"
+    r"|(?P<percent>\b(?P<pct>\d+(?:\.\d+)?)\s*%)"
+    r"|(?P<ordinal>\b(?P<ord>\d+)(?:st|nd|rd|th)\b)"
+    r"|(?P<decimal>\b(?P<whole>\d+)\.(?P<frac>\d+)\b)"
+    r"|(?P<temperature>\b(?P<degrees>\d+)\s*°\s*(?P<unit>[FCfc])\b)"
+    r"|(?P<number>\b\d+\b)"
+)
+_COLON_RE = re.compile(r"(?<!\w):(?!\w)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# TTS chunking split points (see VoiceService._split_into_chunks)
+_SENTENCE_SPLIT_RE = re.compile(r"\n+|(?<=[.!?])\s+")
+_CLAUSE_SPLIT_RE = re.compile(r"(?<=[,;:])\s+|\s+[-–—]\s+|(?<=\))\s+|\s+(?=\d{1,2}:\d{2})")
+
+_CURRENCY_NAMES = {"$": "dollar", "£": "pound", "€": "euro"}
+_IRREGULAR_ORDINALS = {
+    1: "first", 2: "second", 3: "third", 5: "fifth", 8: "eighth",
+    9: "ninth", 12: "twelfth",
+}
+
+
+def _expand_time(m: re.Match) -> str:
+    """5:43 PM → five forty three PM, 14:30 → two thirty PM"""
+    h, mins = int(m["hour"]), int(m["minute"])
+    period = (m["period"] or "").strip()
+    if not period and h >= 13:
+        period = "PM"
+        h -= 12
+    elif not period and h == 0:
+        h = 12
+        period = "AM"
+    h_words = _num_to_words(h)
+    if mins == 0:
+        m_words = "o'clock"
+    elif mins < 10:
+        m_words = "oh " + _num_to_words(mins)
+    else:
+        m_words = _num_to_words(mins)
+    return f"{h_words} {m_words} {period}".strip()
+
+
+def _expand_currency(m: re.Match) -> str:
+    """$5.99 → five dollars and ninety nine cents"""
+    dollars = int(m["units"])
+    cents = int(m["cents"]) if m["cents"] else 0
+    name = _CURRENCY_NAMES.get(m["symbol"], "dollar")
+    plural = name + "s" if dollars != 1 else name
+    result = f"{_num_to_words(dollars)} {plural}"
+    if cents:
+        cent_name = "cents" if cents != 1 else "cent"
+        result += f" and {_num_to_words(cents)} {cent_name}"
+    return result
+
+
+def _expand_percent(m: re.Match) -> str:
+    """85% → eighty five percent"""
+    return _num_to_words(int(float(m["pct"]))) + " percent"
+
+
+def _expand_ordinal(m: re.Match) -> str:
+    """1st → first, 4th → fourth, 20th → twentieth"""
+    n = int(m["ord"])
+    if n in _IRREGULAR_ORDINALS:
+        return _IRREGULAR_ORDINALS[n]
+    word = _num_to_words(n)
+    if word.endswith("y"):
+        return word[:-1] + "ieth"
+    if word.endswith("e"):
+        return word[:-1] + "th"
+    return word + "th"
+
+
+def _expand_decimal(m: re.Match) -> str:
+    """3.14 → three point one four"""
+    whole = _num_to_words(int(m["whole"]))
+    frac = " ".join(_num_to_words(int(d)) for d in m["frac"])
+    return f"{whole} point {frac}"
+
+
+def _expand_temperature(m: re.Match) -> str:
+    """72°F → seventy two degrees Fahrenheit"""
+    unit = "Fahrenheit" if m["unit"].upper() == "F" else "Celsius"
+    return _num_to_words(int(m["degrees"])) + " degrees " + unit
+
+
+def _expand_number(m: re.Match) -> str:
+    """1234 → one thousand two hundred thirty four"""
+    return _num_to_words(int(m["number"]))
+
+
+_NUMERIC_EXPANDERS = {
+    "time": _expand_time,
+    "currency": _expand_currency,
+    "percent": _expand_percent,
+    "ordinal": _expand_ordinal,
+    "decimal": _expand_decimal,
+    "temperature": _expand_temperature,
+    "number": _expand_number,
+}
+
+
+def _expand_numeric(m: re.Match) -> str:
+    # Each alternative's outer group closes last, so lastgroup names the form
+    return _NUMERIC_EXPANDERS[m.lastgroup](m)
+
+
+def wav_header(sample_rate: int, data_size: int) -> bytes:
+    """Build a 44-byte RIFF header for data_size bytes of PCM 16-bit mono audio."""
+    riff_size = data_size + 36
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", riff_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_size,
+    )
+
+
+def _parse_pcm16_wav(data: bytes) -> tuple[int, int, int, int] | None:
+    """
+    Locate the samples of a 16-bit PCM WAV by walking its RIFF chunks.
+
+    Returns (channels, sample_rate, data_start, data_end), or None if the file
+    is not 16-bit integer PCM or the header is malformed.
+    """
+    if len(data) < 12 or data[8:12] != b"WAVE":
+        return None
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", data, offset)
+        body = offset + 8
+        if chunk_id == b"fmt " and chunk_size >= 16:
+            if body + 16 > len(data):
+                return None
+            fmt = struct.unpack_from("<HHIIHH", data, body)
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            audio_format, channels, sample_rate, _, block_align, bits = fmt
+            # 1 = PCM, 0xFFFE = WAVE_FORMAT_EXTENSIBLE (PCM for 16-bit in practice)
+            if audio_format not in (1, 0xFFFE) or bits != 16 or channels < 1:
+                return None
+            # A frame is one int16 per channel; anything else is a bad header
+            if block_align != channels * 2:
+                return None
+            # Streaming writers leave the size at 0xFFFFFFFF and truncated
+            # uploads overstate it, so clamp to the bytes actually present
+            end = min(body + chunk_size, len(data))
+            end -= (end - body) % block_align
+            return channels, sample_rate, body, end
+        # Chunks are word-aligned
+        offset = body + chunk_size + (chunk_size & 1)
+    return None
+
+
 def _get_vosk():
     global _vosk
     if _vosk is None:
@@ -59,6 +275,68 @@ def _get_vosk():
     return _vosk
 
 
+def _get_resample_poly():
+    global _resample_poly
+    if _resample_poly is None:
+        try:
+            from scipy.signal import resample_poly
+            _resample_poly = resample_poly
+        except ImportError:
+            logger.warning("scipy not installed, falling back to linear resampling")
+            _resample_poly = False
+    return _resample_poly or None
+
+
+def _get_av():
+    global _av
+    if _av is None:
+        try:
+            import av
+            _av = av
+        except ImportError:
+            logger.warning("PyAV not installed, falling back to the ffmpeg CLI for decoding")
+            _av = False
+    return _av or None
+
+
+@lru_cache(maxsize=1024)
+def _phonemize(tokenizer, text: str, lang: str) -> str:
+    """
+    Phonemize one TTS chunk with espeak, cached per (text, lang).
+
+    Replies repeat whole sentences ("The light is now on."), and espeak runs
+    behind a process-wide lock, so a hit also skips waiting on that lock.
+    """
+    return tokenizer.phonemize(text, lang)
+
+
+def _create_onnx_session(model_path: Path, intra_op_threads: int = 0):
+    """
+    Build a CPU ONNX Runtime session with every graph optimization enabled.
+
+    intra_op_threads <= 0 divides the cores among the _CHUNK_WORKERS chunks
+    that can run at once, instead of ORT's default of every core per run.
+    """
+    import onnxruntime as ort
+
+    if intra_op_threads <= 0:
+        intra_op_threads = max(1, (os.cpu_count() or 1) // _CHUNK_WORKERS)
+
+    options = ort.SessionOptions()
+    # Constant folding, node fusion and layout transforms, done once at load
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = 1
+    # Per-run allocations are freed instead of pooled in an arena that only grows
+    options.enable_cpu_mem_arena = False
+    return ort.InferenceSession(
+        str(model_path),
+        sess_options=options,
+        providers=["CPUExecutionProvider"],
+    )
+
+
 class VoiceService:
     """Service for speech-to-text and text-to-speech processing."""
 
@@ -70,6 +348,9 @@ class VoiceService:
         kokoro_voice: str = "af_heart",
         kokoro_speed: float = 1.0,
         kokoro_lang: str = "en-us",
+        tts_cache_size: int = 256,
+        stt_cache_size: int = 64,
+        tts_threads: int = 0,
     ):
         self.vosk_model_path = Path(vosk_model_path) if vosk_model_path else None
         self.kokoro_model_path = Path(kokoro_model_path) if kokoro_model_path else None
@@ -77,21 +358,40 @@ class VoiceService:
         self.kokoro_voice = kokoro_voice
         self.kokoro_speed = kokoro_speed
         self.kokoro_lang = kokoro_lang
+        self.tts_threads = tts_threads
         self._vosk_model = None
         self._kokoro_model = None
+        # Separate locks so a slow Kokoro load never holds up Vosk
+        self._vosk_lock = threading.Lock()
+        self._kokoro_lock = threading.Lock()
+        # LRU of synthesized WAV bytes keyed by (voice, speed, lang, text)
+        self._tts_cache: OrderedDict[tuple[str, float, str, str], bytes] = OrderedDict()
+        self._tts_cache_size = tts_cache_size
+        self._tts_cache_lock = threading.Lock()
+        # LRU of transcripts keyed by (sample_rate, hash of the uploaded audio)
+        self._stt_cache: OrderedDict[tuple[int, bytes], str] = OrderedDict()
+        self._stt_cache_size = stt_cache_size
+        self._stt_cache_lock = threading.Lock()
+        # Reusable WAV output buffers, one per concurrent synthesis
+        self._buf_pool: queue.LifoQueue[bytearray] = queue.LifoQueue(maxsize=4)
+        # Reusable Kaldi recognizers per sample rate, one per concurrent transcription
+        self._recognizer_pools: dict[int, queue.LifoQueue] = {}
+        self._recognizer_pools_lock = threading.Lock()
 
     def _load_vosk_model(self):
-        """Lazy load Vosk model."""
+        """Lazy load Vosk model (concurrent callers wait for a single load)."""
         if self._vosk_model is None and self.vosk_model_path:
-            vosk = _get_vosk()
-            if not self.vosk_model_path.exists():
-                raise FileNotFoundError(f"Vosk model not found: {self.vosk_model_path}")
-            vosk.SetLogLevel(-1)  # Suppress Vosk logs
-            self._vosk_model = vosk.Model(str(self.vosk_model_path))
-            logger.info(f"Loaded Vosk model from {self.vosk_model_path}")
+            with self._vosk_lock:
+                if self._vosk_model is None:
+                    vosk = _get_vosk()
+                    if not self.vosk_model_path.exists():
+                        raise FileNotFoundError(f"Vosk model not found: {self.vosk_model_path}")
+                    vosk.SetLogLevel(-1)  # Suppress Vosk logs
+                    self._vosk_model = vosk.Model(str(self.vosk_model_path))
+                    logger.info(f"Loaded Vosk model from {self.vosk_model_path}")
         return self._vosk_model
 
-    def transcribe(self, audio_data: bytes, sample_rate: int = 16000) -> str:
+    def transcribe(self, audio_data: bytes | bytearray, sample_rate: int = 16000) -> str:
         """
         Transcribe audio to text using Vosk.
 
@@ -102,45 +402,179 @@ class VoiceService:
         Returns:
             Transcribed text
         """
-        model = self._load_vosk_model()
-        if model is None:
-            raise RuntimeError("Vosk model not loaded")
-
-        vosk = _get_vosk()
+        if self._stt_cache_size <= 0:
+            return self._transcribe_bytes(audio_data, sample_rate)
+
+        key = (sample_rate, hashlib.blake2b(audio_data, digest_size=16).digest())
+        text = self._get_cached_transcript(key)
+        if text is None:
+            text = self._transcribe_bytes(audio_data, sample_rate)
+            self._cache_transcript(key, text)
+        return text
 
+    def _transcribe_bytes(self, audio_data: bytes | bytearray, sample_rate: int) -> str:
+        """Convert an in-memory upload to PCM and run it through Vosk."""
         # Convert audio to proper format if needed
         pcm_data = self._convert_to_pcm(audio_data, sample_rate)
 
-        # Create recognizer and process audio
-        recognizer = vosk.KaldiRecognizer(model, sample_rate)
-        recognizer.SetWords(True)
+        # Feed Vosk in the same 64KB chunks as the streaming path. Its cffi
+        # binding only takes bytes, so each memoryview slice is copied once.
+        chunk_size = _STREAM_CHUNK_BYTES
+        with memoryview(pcm_data) as view:
+            return self._recognize(
+                (bytes(view[i:i + chunk_size]) for i in range(0, len(view), chunk_size)),
+                sample_rate,
+            )
+
+    def transcribe_stream(self, file_obj: BinaryIO, sample_rate: int = 16000) -> str:
+        """
+        Transcribe audio read incrementally from a file-like object.
+
+        16-bit mono WAV at the target rate and raw PCM are fed to Vosk straight
+        from the file in 64KB chunks, without materializing the whole upload.
+        Compressed or non-native formats fall back to transcribe().
+
+        Args:
+            file_obj: Seekable binary file (e.g. UploadFile.file)
+            sample_rate: Sample rate expected by Vosk (default 16000)
 
-        # Process in chunks
-        chunk_size = 4000
-        for i in range(0, len(pcm_data), chunk_size):
-            chunk = pcm_data[i:i + chunk_size]
+        Returns:
+            Transcribed text
+        """
+        if self._stt_cache_size <= 0:
+            return self._transcribe_file(file_obj, sample_rate)
+
+        # Hashing reads the file once more, but at memory speed, not Vosk speed
+        digest = hashlib.file_digest(file_obj, lambda: hashlib.blake2b(digest_size=16)).digest()
+        file_obj.seek(0)
+        key = (sample_rate, digest)
+        text = self._get_cached_transcript(key)
+        if text is None:
+            text = self._transcribe_file(file_obj, sample_rate)
+            self._cache_transcript(key, text)
+        return text
+
+    def _transcribe_file(self, file_obj: BinaryIO, sample_rate: int) -> str:
+        """Stream a native-format upload into Vosk, or decode it in memory."""
+        head = file_obj.read(12)
+        file_obj.seek(0)
+
+        if head[:4] == b"RIFF":
+            try:
+                wav = wave.open(file_obj, "rb")
+            except (wave.Error, EOFError):
+                wav = None
+            if (
+                wav is not None
+                and wav.getnchannels() == 1
+                and wav.getsampwidth() == 2
+                and wav.getframerate() == sample_rate
+            ):
+                frames = _STREAM_CHUNK_BYTES // 2
+                return self._recognize(iter(lambda: wav.readframes(frames), b""), sample_rate)
+        elif not self._needs_decoding(head):
+            return self._recognize(iter(lambda: file_obj.read(_STREAM_CHUNK_BYTES), b""), sample_rate)
+
+        # Needs ffmpeg decoding or resampling: read into a buffer sized up front
+        size = file_obj.seek(0, io.SEEK_END)
+        file_obj.seek(0)
+        buf = bytearray(size)
+        with memoryview(buf) as view:
+            filled = 0
+            while filled < size:
+                n = file_obj.readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+        return self._transcribe_bytes(buf if filled == size else buf[:filled], sample_rate)
+
+    def _get_cached_transcript(self, key: tuple[int, bytes]) -> str | None:
+        """Look up a transcript, marking it most recently used."""
+        with self._stt_cache_lock:
+            text = self._stt_cache.get(key)
+            if text is not None:
+                self._stt_cache.move_to_end(key)
+                logger.debug("STT cache hit")
+            return text
+
+    def _cache_transcript(self, key: tuple[int, bytes], text: str) -> None:
+        """Store a transcript, evicting the least recently used past the limit."""
+        with self._stt_cache_lock:
+            self._stt_cache[key] = text
+            while len(self._stt_cache) > self._stt_cache_size:
+                self._stt_cache.popitem(last=False)
+
+    def _recognize(self, chunks: Iterable[bytes], sample_rate: int) -> str:
+        """Feed PCM 16-bit mono chunks to a Vosk recognizer and return the text."""
+        recognizer = self._acquire_recognizer(sample_rate)
+
+        total = 0
+        for chunk in chunks:
             recognizer.AcceptWaveform(chunk)
+            total += len(chunk)
 
-        # Get final result
+        # Get final result; only a recognizer that finished cleanly is reused
         result = json.loads(recognizer.FinalResult())
+        self._release_recognizer(sample_rate, recognizer)
         text = result.get("text", "").strip()
 
-        logger.info(f"Transcribed ({len(pcm_data)} bytes audio): '{text}'")
+        logger.info(f"Transcribed ({total} bytes audio): '{text}'")
         return text
 
+    def prewarm_stt(self, sample_rate: int = 16000) -> None:
+        """Load the Vosk model and pool a recognizer so the first request skips both."""
+        try:
+            self._release_recognizer(sample_rate, self._acquire_recognizer(sample_rate))
+        except Exception as e:
+            logger.warning(f"STT prewarm failed: {e}")
+            return
+        logger.info("STT model prewarmed")
+
+    def _acquire_recognizer(self, sample_rate: int):
+        """Take a reset recognizer for sample_rate from the pool, or build one."""
+        pool = self._recognizer_pools.get(sample_rate)
+        if pool is not None:
+            try:
+                recognizer = pool.get_nowait()
+                recognizer.Reset()
+                return recognizer
+            except queue.Empty:
+                pass
+
+        model = self._load_vosk_model()
+        if model is None:
+            raise RuntimeError("Vosk model not loaded")
+
+        recognizer = _get_vosk().KaldiRecognizer(model, sample_rate)
+        recognizer.SetWords(True)
+        return recognizer
+
+    def _release_recognizer(self, sample_rate: int, recognizer) -> None:
+        """Return a recognizer to its pool (dropped if the pool is full)."""
+        pool = self._recognizer_pools.get(sample_rate)
+        if pool is None:
+            with self._recognizer_pools_lock:
+                pool = self._recognizer_pools.setdefault(sample_rate, queue.LifoQueue(maxsize=4))
+        try:
+            pool.put_nowait(recognizer)
+        except queue.Full:
+            pass
+
     def _load_kokoro_model(self):
-        """Lazy load Kokoro model."""
+        """Lazy load Kokoro model (concurrent callers wait for a single load)."""
         if self._kokoro_model is None and self.kokoro_model_path and self.kokoro_voices_path:
-            from kokoro_onnx import Kokoro
-            if not self.kokoro_model_path.exists():
-                raise FileNotFoundError(f"Kokoro model not found: {self.kokoro_model_path}")
-            if not self.kokoro_voices_path.exists():
-                raise FileNotFoundError(f"Kokoro voices not found: {self.kokoro_voices_path}")
-            self._kokoro_model = Kokoro(
-                str(self.kokoro_model_path),
-                str(self.kokoro_voices_path),
-            )
-            logger.info(f"Loaded Kokoro model from {self.kokoro_model_path}")
+            with self._kokoro_lock:
+                if self._kokoro_model is None:
+                    from kokoro_onnx import Kokoro
+                    if not self.kokoro_model_path.exists():
+                        raise FileNotFoundError(f"Kokoro model not found: {self.kokoro_model_path}")
+                    if not self.kokoro_voices_path.exists():
+                        raise FileNotFoundError(f"Kokoro voices not found: {self.kokoro_voices_path}")
+                    self._kokoro_model = Kokoro.from_session(
+                        _create_onnx_session(self.kokoro_model_path, self.tts_threads),
+                        str(self.kokoro_voices_path),
+                    )
+                    logger.info(f"Loaded Kokoro model from {self.kokoro_model_path}")
         return self._kokoro_model
 
     def _clean_text_for_tts(self, text: str) -> str:
@@ -151,130 +585,32 @@ class VoiceService:
         to their spoken English form. Strips emojis, markdown, arrows, and
         other symbols that TTS engines can't pronounce.
         """
-        # --- Strip non-pronounceable characters ---
+        if not _NEEDS_CLEAN_RE.search(text):
+            return _WHITESPACE_RE.sub(" ", text).strip()
 
-        # Remove emojis
-        text = re.compile(
-            "["
-            "\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF"
-            "\U0001F1E0-\U0001F1FF\U00002702-\U000027B0\U000024C2-\U0001F251"
-            "\U0001F900-\U0001F9FF\U0001FA00-\U0001FA6F\U0001FA70-\U0001FAFF"
-            "\U00002600-\U000026FF\U00002700-\U000027BF"
-            "]+",
-            flags=re.UNICODE,
-        ).sub("", text)
-
-        # Remove arrows and symbols
-        text = re.sub(r"[→←↑↓↔↕⇒⇐⇑⇓⇔⇕➔➜➡➤►▶◄◀•●○◦▪▫★☆✓✗✔✘|~`^]", " ", text)
-
-        # Remove markdown formatting
-        text = re.sub(r"\*\*([^*]+)\*\*", r"\1", text)  # **bold**
-        text = re.sub(r"\*([^*]+)\*", r"\1", text)       # *italic*
-        text = re.sub(r"__([^_]+)__", r"\1", text)       # __underline__
-        text = re.sub(r"_([^_]+)_", r"\1", text)         # _italic_
-        text = re.sub(r"`([^`]+)`", r"\1", text)         # `code`
+        # --- Strip non-pronounceable characters ---
+        text = _EMOJI_RE.sub("", text)
+        text = _SYMBOL_RE.sub(" ", text)
+        for pattern in _MARKDOWN_RES:
+            text = pattern.sub(r"\1", text)
 
         # --- Normalize numbers and symbols to spoken English ---
 
         # Unit symbols adjacent to numbers: 20.5°C → 20.5 degrees celsius
-        text = re.sub(r'°C\b', ' degrees celsius', text)
-        text = re.sub(r'°F\b', ' degrees fahrenheit', text)
-
-        # Times: 5:43 PM → five forty three PM, 14:30 → two thirty PM
-        def _expand_time(m: re.Match) -> str:
-            h, mins = int(m.group(1)), int(m.group(2))
-            period = (m.group(3) or "").strip()
-            if not period and h >= 13:
-                period = "PM"
-                h -= 12
-            elif not period and h == 0:
-                h = 12
-                period = "AM"
-            h_words = _num_to_words(h)
-            if mins == 0:
-                m_words = "o'clock"
-            elif mins < 10:
-                m_words = "oh " + _num_to_words(mins)
-            else:
-                m_words = _num_to_words(mins)
-            return f"{h_words} {m_words} {period}".strip()
-
-        # Match H:MM or HH:MM with optional seconds and AM/PM
-        text = re.sub(
-            r'\b(\d{1,2}):(\d{2})(?::\d{2})?\s*(AM|PM|am|pm|A\.M\.|P\.M\.)?\b',
-            _expand_time,
-            text,
-        )
-
-        # Currency: $5.99 → five dollars and ninety nine cents
-        def _expand_currency(m: re.Match) -> str:
-            symbol = m.group(1)
-            dollars = int(m.group(2))
-            cents = int(m.group(3)) if m.group(3) else 0
-            name = {"$": "dollar", "\u00a3": "pound", "\u20ac": "euro"}.get(symbol, "dollar")
-            plural = name + "s" if dollars != 1 else name
-            result = f"{_num_to_words(dollars)} {plural}"
-            if cents:
-                cent_name = "cents" if cents != 1 else "cent"
-                result += f" and {_num_to_words(cents)} {cent_name}"
-            return result
-
-        text = re.sub(r'([$£€])(\d+)(?:\.(\d{2}))?\b', _expand_currency, text)
-
-        # Percentages: 85% → eighty five percent
-        text = re.sub(
-            r'\b(\d+(?:\.\d+)?)\s*%',
-            lambda m: _num_to_words(int(float(m.group(1)))) + " percent",
-            text,
-        )
-
-        # Ordinals: 1st, 2nd, 3rd, 4th...
-        _ordinal_suffixes = {
-            1: "first", 2: "second", 3: "third", 5: "fifth", 8: "eighth",
-            9: "ninth", 12: "twelfth",
-        }
-        def _expand_ordinal(m: re.Match) -> str:
-            n = int(m.group(1))
-            if n in _ordinal_suffixes:
-                return _ordinal_suffixes[n]
-            word = _num_to_words(n)
-            if word.endswith("y"):
-                return word[:-1] + "ieth"
-            if word.endswith("e"):
-                return word[:-1] + "th"
-            return word + "th"
-
-        text = re.sub(r'\b(\d+)(?:st|nd|rd|th)\b', _expand_ordinal, text)
-
-        # Decimals: 3.14 → three point one four
-        def _expand_decimal(m: re.Match) -> str:
-            whole = _num_to_words(int(m.group(1)))
-            frac = " ".join(_num_to_words(int(d)) for d in m.group(2))
-            return f"{whole} point {frac}"
-
-        text = re.sub(r'\b(\d+)\.(\d+)\b', _expand_decimal, text)
-
-        # Temperature units: 72°F → seventy two degrees Fahrenheit
-        text = re.sub(
-            r'\b(\d+)\s*°\s*([FCfc])\b',
-            lambda m: _num_to_words(int(m.group(1))) + " degrees " +
-                      ("Fahrenheit" if m.group(2).upper() == "F" else "Celsius"),
-            text,
-        )
+        text = _CELSIUS_RE.sub(" degrees celsius", text)
+        text = _FAHRENHEIT_RE.sub(" degrees fahrenheit", text)
 
-        # Bare numbers: 1234 → one thousand two hundred thirty four
-        text = re.sub(r'\b(\d+)\b', lambda m: _num_to_words(int(m.group(1))), text)
+        # Times, currency, percentages, ordinals, decimals, temperatures, integers
+        text = _NUMERIC_RE.sub(_expand_numeric, text)
 
         # Standalone colons (keep nothing — times already handled)
-        text = re.sub(r"(?<!\w):(?!\w)", " ", text)
+        text = _COLON_RE.sub(" ", text)
 
         # Degree symbol without unit
         text = text.replace("°", " degrees ")
 
         # Collapse multiple spaces and trim
-        text = re.sub(r"\s+", " ", text).strip()
-
-        return text
+        return _WHITESPACE_RE.sub(" ", text).strip()
 
     def _split_into_chunks(self, text: str, max_chars: int = 100) -> list[str]:
         """
@@ -283,47 +619,87 @@ class VoiceService:
         Uses a cascade of split points: newlines, sentences, clauses,
         then parentheses/timestamps as a last resort.
         """
-        # First split on newlines and sentence boundaries
-        segments = re.split(r'\n+|(?<=[.!?])\s+', text)
-
         chunks: list[str] = []
-        current = ""
+        # Pieces of the chunk being built, and its length once space-joined
+        current: list[str] = []
+        current_len = 0
 
-        for segment in segments:
+        # First split on newlines and sentence boundaries
+        for segment in _SENTENCE_SPLIT_RE.split(text):
             segment = segment.strip()
             if not segment:
                 continue
 
             # If a single segment exceeds max_chars, break it down further
+            # on clauses, parentheses, or before timestamps
             if len(segment) > max_chars:
                 if current:
-                    chunks.append(current.strip())
-                    current = ""
-                # Split on clauses, parentheses, or before timestamps
-                parts = re.split(
-                    r'(?<=[,;:])\s+|\s+[-–—]\s+|(?<=\))\s+|\s+(?=\d{1,2}:\d{2})',
-                    segment,
-                )
-                for part in parts:
-                    part = part.strip()
-                    if not part:
-                        continue
-                    if len(current) + len(part) + 1 > max_chars and current:
-                        chunks.append(current.strip())
-                        current = part
-                    else:
-                        current = f"{current} {part}".strip() if current else part
-            elif len(current) + len(segment) + 1 > max_chars and current:
-                chunks.append(current.strip())
-                current = segment
+                    chunks.append(" ".join(current))
+                    current, current_len = [], 0
+                pieces = _CLAUSE_SPLIT_RE.split(segment)
             else:
-                current = f"{current} {segment}".strip() if current else segment
+                pieces = (segment,)
+
+            for piece in pieces:
+                piece = piece.strip()
+                if not piece:
+                    continue
+                if current and current_len + len(piece) + 1 > max_chars:
+                    chunks.append(" ".join(current))
+                    current, current_len = [piece], len(piece)
+                elif current:
+                    current.append(piece)
+                    current_len += len(piece) + 1
+                else:
+                    current, current_len = [piece], len(piece)
 
         if current:
-            chunks.append(current.strip())
+            chunks.append(" ".join(current))
 
         return chunks if chunks else [text]
 
+    def _iter_samples(self, kokoro, text: str) -> Iterator[tuple[np.ndarray, int]]:
+        """
+        Clean and chunk text, then yield (samples, sample_rate) per chunk.
+
+        Samples are float in [-1.0, 1.0], ready to scale to int16.
+
+        A brief pause (0.15s silence) follows every chunk except the last.
+        """
+        # Clean text before synthesis
+        clean_text = self._clean_text_for_tts(text)
+        logger.debug(f"TTS text cleaned: '{text}' -> '{clean_text}'")
+
+        chunks = self._split_into_chunks(clean_text)
+        logger.info(f"TTS input ({len(clean_text)} chars): {clean_text[:100]}...")
+        logger.info(f"TTS split into {len(chunks)} chunk(s): {[len(c) for c in chunks]} chars")
+
+        def create(chunk: str) -> tuple[np.ndarray, int]:
+            return kokoro.create(
+                _phonemize(kokoro.tokenizer, chunk, self.kokoro_lang),
+                voice=self.kokoro_voice,
+                speed=self.kokoro_speed,
+                is_phonemes=True,
+            )
+
+        # Kokoro has no batch API, so multi-chunk text runs chunks on a small
+        # pool; map() still yields results in order as each one completes
+        spoken = [(i, chunk) for i, chunk in enumerate(chunks) if chunk.strip()]
+        if len(spoken) > 1:
+            results = _chunk_executor.map(create, [chunk for _, chunk in spoken])
+        else:
+            results = (create(chunk) for _, chunk in spoken)
+
+        for (i, _), (samples, sr) in zip(spoken, results):
+            # Saturate in place: Kokoro can overshoot ±1.0 slightly, which
+            # would otherwise wrap around when cast to int16
+            np.clip(samples, -1.0, 1.0, out=samples)
+            yield samples, sr
+
+            # Add a brief pause (0.15s silence) between chunks
+            if i < len(chunks) - 1:
+                yield np.zeros(int(sr * 0.15), dtype=samples.dtype), sr
+
     def synthesize(self, text: str) -> bytes:
         """
         Synthesize text to speech using Kokoro.
@@ -337,63 +713,108 @@ class VoiceService:
         Returns:
             WAV audio bytes (24kHz sample rate)
         """
+        key = (self.kokoro_voice, self.kokoro_speed, self.kokoro_lang, text)
+        with self._tts_cache_lock:
+            cached = self._tts_cache.get(key)
+            if cached is not None:
+                self._tts_cache.move_to_end(key)
+                logger.debug(f"TTS cache hit ({len(text)} chars)")
+                return cached
+
+        buf = self._acquire_buffer()
+        try:
+            size = self.synthesize_into(text, buf)
+            with memoryview(buf)[:size] as view:
+                audio = bytes(view)
+        finally:
+            self._release_buffer(buf)
+
+        if self._tts_cache_size > 0:
+            with self._tts_cache_lock:
+                self._tts_cache[key] = audio
+                while len(self._tts_cache) > self._tts_cache_size:
+                    self._tts_cache.popitem(last=False)
+        return audio
+
+    def synthesize_into(self, text: str, out: bytearray) -> int:
+        """
+        Synthesize text to a WAV file written into `out`.
+
+        `out` is grown if it is too small and never shrunk, so a reused buffer
+        settles at a steady-state size and stops reallocating.
+
+        Args:
+            text: Text to synthesize
+            out: Destination buffer
+
+        Returns:
+            Number of bytes of WAV data written to the start of `out`
+        """
         kokoro = self._load_kokoro_model()
         if kokoro is None:
             raise RuntimeError("Kokoro model not loaded")
 
-        # Clean text before synthesis
-        clean_text = self._clean_text_for_tts(text)
-        logger.debug(f"TTS text cleaned: '{text}' -> '{clean_text}'")
-
-        chunks = self._split_into_chunks(clean_text)
-        logger.info(f"TTS input ({len(clean_text)} chars): {clean_text[:100]}...")
-        logger.info(f"TTS split into {len(chunks)} chunk(s): {[len(c) for c in chunks]} chars")
-
         try:
             all_samples: list[np.ndarray] = []
             sample_rate = None
 
-            for i, chunk in enumerate(chunks):
-                if not chunk.strip():
-                    continue
-                samples, sr = kokoro.create(
-                    chunk,
-                    voice=self.kokoro_voice,
-                    speed=self.kokoro_speed,
-                    lang=self.kokoro_lang,
-                )
+            for samples, sr in self._iter_samples(kokoro, text):
                 all_samples.append(samples)
                 sample_rate = sr
 
-                # Add a brief pause (0.15s silence) between chunks
-                if i < len(chunks) - 1:
-                    pause = np.zeros(int(sr * 0.15), dtype=samples.dtype)
-                    all_samples.append(pause)
-
             if not all_samples or sample_rate is None:
                 raise RuntimeError("No audio generated")
 
-            combined = np.concatenate(all_samples)
-
-            # Convert to int16
-            audio_int16 = (combined * 32767).astype(np.int16)
-
-            # Write to WAV buffer
-            wav_buffer = io.BytesIO()
-            with wave.open(wav_buffer, 'wb') as wav:
-                wav.setnchannels(1)
-                wav.setsampwidth(2)
-                wav.setframerate(sample_rate)
-                wav.writeframes(audio_int16.tobytes())
-
-            wav_buffer.seek(0)
-            logger.debug(f"Synthesized {len(text)} chars ({len(chunks)} chunks) to WAV ({len(wav_buffer.getvalue())} bytes)")
-            return wav_buffer.getvalue()
+            # Chunk lengths are known now: size the buffer once, then convert
+            # each chunk to int16 directly into its slot (no concatenate copy)
+            total = sum(samples.size for samples in all_samples)
+            data_size = total * 2
+            size = _WAV_HEADER_SIZE + data_size
+            if len(out) < size:
+                out.extend(bytes(size - len(out)))
+            with memoryview(out) as view:
+                view[:_WAV_HEADER_SIZE] = wav_header(sample_rate, data_size)
+
+            pcm = np.frombuffer(out, dtype=np.int16, count=total, offset=_WAV_HEADER_SIZE)
+            offset = 0
+            for samples in all_samples:
+                end = offset + samples.size
+                np.multiply(samples, 32767, out=pcm[offset:end], casting="unsafe")
+                offset = end
+            # Release the export so `out` can be resized on its next use
+            del pcm
+
+            logger.debug(f"Synthesized {len(text)} chars to WAV ({size} bytes)")
+            return size
 
         except Exception as e:
             logger.error(f"Kokoro TTS failed: {e}")
             raise RuntimeError(f"TTS synthesis failed: {e}")
 
+    def _acquire_buffer(self) -> bytearray:
+        """Take a synthesis buffer from the pool, or allocate a new one."""
+        try:
+            return self._buf_pool.get_nowait()
+        except queue.Empty:
+            return bytearray()
+
+    def _release_buffer(self, buf: bytearray) -> None:
+        """Return a synthesis buffer to the pool (dropped if the pool is full)."""
+        try:
+            self._buf_pool.put_nowait(buf)
+        except queue.Full:
+            pass
+
+    def prewarm(self, texts: Iterable[str]) -> None:
+        """Synthesize texts ahead of time so their first request is a cache hit."""
+        for text in texts:
+            try:
+                self.synthesize(text)
+            except Exception as e:
+                logger.warning(f"TTS prewarm failed for '{text}': {e}")
+                return
+        logger.info("TTS cache prewarmed")
+
     def set_voice(self, voice: str) -> None:
         """Set the TTS voice."""
         self.kokoro_voice = voice
@@ -406,18 +827,31 @@ class VoiceService:
 
     def _convert_to_pcm(self, audio_data: bytes, target_rate: int) -> bytes:
         """Convert various audio formats to PCM 16-bit mono."""
-        import subprocess
-        import tempfile
-
         # Check if it's already a WAV file
         if audio_data[:4] == b"RIFF":
-            # Read WAV and convert to target format
-            audio_buffer = io.BytesIO(audio_data)
-            data, sample_rate = sf.read(audio_buffer, dtype="int16")
-
-            # Convert stereo to mono if needed
-            if len(data.shape) > 1:
-                data = data.mean(axis=1).astype(np.int16)
+            pcm = _parse_pcm16_wav(audio_data)
+            if pcm is not None:
+                channels, sample_rate, start, end = pcm
+                # Already 16-bit mono at the target rate: hand back the samples as-is
+                if channels == 1 and sample_rate == target_rate:
+                    with memoryview(audio_data) as view:
+                        return bytes(view[start:end])
+                data = np.frombuffer(audio_data, dtype="<i2", count=(end - start) // 2, offset=start)
+                if channels > 1:
+                    data = data.reshape(-1, channels)
+            else:
+                # Other encodings (float, 24-bit, ADPCM...) go through libsndfile
+                audio_buffer = io.BytesIO(audio_data)
+                data, sample_rate = sf.read(audio_buffer, dtype="int16")
+
+            # Convert stereo to mono if needed, averaging in int32 so there
+            # is no float64 intermediate
+            if data.ndim > 1:
+                if data.shape[1] == 2:
+                    mixed = (data[:, 0].astype(np.int32) + data[:, 1]) >> 1
+                else:
+                    mixed = data.sum(axis=1, dtype=np.int32) // data.shape[1]
+                data = mixed.astype(np.int16)
 
             # Resample if needed
             if sample_rate != target_rate:
@@ -425,66 +859,89 @@ class VoiceService:
 
             return data.tobytes()
 
-        # Check for webm/ogg/mp4 formats (browser MediaRecorder output)
-        # webm starts with 0x1A45DFA3, ogg with OggS, mp4 with ftyp after first bytes
-        is_webm = audio_data[:4] == b"\x1a\x45\xdf\xa3"
-        is_ogg = audio_data[:4] == b"OggS"
-        is_mp4 = b"ftyp" in audio_data[:12]
-
-        if is_webm or is_ogg or is_mp4:
-            # Use ffmpeg to convert to WAV
-            ext = ".webm" if is_webm else ".ogg" if is_ogg else ".mp4"
-            try:
-                with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as in_file:
-                    in_file.write(audio_data)
-                    in_path = in_file.name
-
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as out_file:
-                    out_path = out_file.name
-
-                # Convert with ffmpeg: mono, 16-bit, target sample rate
-                result = subprocess.run(
-                    [
-                        "ffmpeg", "-y", "-i", in_path,
-                        "-ar", str(target_rate),
-                        "-ac", "1",
-                        "-sample_fmt", "s16",
-                        out_path
-                    ],
-                    capture_output=True,
-                    timeout=30
-                )
-
-                if result.returncode != 0:
-                    logger.error(f"ffmpeg conversion failed: {result.stderr.decode()}")
-                    raise RuntimeError("Audio conversion failed")
-
-                # Read the converted WAV
-                with open(out_path, "rb") as f:
-                    wav_data = f.read()
-
-                # Parse WAV and extract PCM
-                audio_buffer = io.BytesIO(wav_data)
-                data, _ = sf.read(audio_buffer, dtype="int16")
-                return data.tobytes()
-
-            finally:
-                # Cleanup temp files
-                import os
-                try:
-                    os.unlink(in_path)
-                    os.unlink(out_path)
-                except:
-                    pass
+        if self._needs_decoding(audio_data):
+            if _get_av() is not None:
+                return self._decode_with_av(audio_data, target_rate)
+            return self._decode_with_ffmpeg(audio_data, target_rate)
 
         # Assume raw PCM data
         return audio_data
 
+    def _decode_with_av(self, audio_data: bytes, target_rate: int) -> bytes:
+        """Decode a compressed upload in-process with PyAV to PCM 16-bit mono."""
+        av = _get_av()
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=target_rate)
+        frames: list[memoryview] = []
+        try:
+            with av.open(io.BytesIO(audio_data)) as container:
+                for frame in container.decode(audio=0):
+                    for out in resampler.resample(frame):
+                        frames.append(memoryview(out.planes[0])[:out.samples * 2])
+                # Flush samples still buffered in the resampler
+                for out in resampler.resample(None):
+                    frames.append(memoryview(out.planes[0])[:out.samples * 2])
+        except av.FFmpegError as e:
+            logger.error(f"PyAV decoding failed: {e}")
+            raise RuntimeError("Audio conversion failed")
+        return b"".join(frames)
+
+    def _decode_with_ffmpeg(self, audio_data: bytes, target_rate: int) -> bytes:
+        """Decode a compressed upload to PCM 16-bit mono via the ffmpeg CLI."""
+        import subprocess
+        import tempfile
+
+        # Pipe the upload in on stdin and take raw s16le from stdout: no WAV
+        # container to parse afterwards. Non-fragmented MP4 (Safari/iOS) keeps
+        # its moov index at the end, which ffmpeg can't seek to on a pipe, so
+        # those go through a temp file instead.
+        tmp_path = None
+        if audio_data[4:8] == b"ftyp":
+            with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp:
+                tmp.write(audio_data)
+                tmp_path = tmp.name
+
+        try:
+            result = subprocess.run(
+                [
+                    "ffmpeg", "-hide_banner", "-loglevel", "error",
+                    "-i", tmp_path or "pipe:0",
+                    "-f", "s16le",
+                    "-ar", str(target_rate),
+                    "-ac", "1",
+                    "pipe:1",
+                ],
+                input=None if tmp_path else audio_data,
+                capture_output=True,
+                timeout=30,
+            )
+        finally:
+            if tmp_path:
+                os.unlink(tmp_path)
+
+        if result.returncode != 0:
+            logger.error(f"ffmpeg conversion failed: {result.stderr.decode()}")
+            raise RuntimeError("Audio conversion failed")
+
+        return result.stdout
+
+    @staticmethod
+    def _needs_decoding(header: bytes) -> bool:
+        """Check for webm/ogg/mp4 formats (browser MediaRecorder output)."""
+        # mp4's first box is always ftyp, right after its 4-byte size
+        return header[:4] in _COMPRESSED_MAGICS or header[4:8] == b"ftyp"
+
     def _resample(self, data: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
-        """Simple resampling using linear interpolation."""
+        """Polyphase resampling (anti-aliased), or linear interpolation without scipy."""
         if src_rate == dst_rate:
             return data
 
+        resample_poly = _get_resample_poly()
+        if resample_poly is not None:
+            g = gcd(src_rate, dst_rate)
+            resampled = resample_poly(data, dst_rate // g, src_rate // g)
+            # The FIR can overshoot full scale; clip before narrowing to int16
+            return np.clip(resampled, -32768, 32767).astype(np.int16)
+
         duration = len(data) / src_rate
         new_length = int(duration * dst_rate)
         indices = np.linspace(0, len(data) - 1, new_length)
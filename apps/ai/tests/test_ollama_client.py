@@ -0,0 +1,63 @@
+"""Prompt rounding and the response cache in OllamaClient.analyze."""
+
+import unittest
+
+import orjson
+
+from src.models.telemetry import Reading, TelemetryMessage
+from src.services.ollama_client import OllamaClient
+
+NO_ACTION = orjson.dumps({"response": orjson.dumps({"action": "none", "reason": "ok"}).decode()})
+
+
+class FakeResponse:
+    content = NO_ACTION
+
+    def raise_for_status(self):
+        pass
+
+
+def telemetry(temp: float, humidity: float) -> TelemetryMessage:
+    return TelemetryMessage(
+        version=1,
+        ts=0,
+        device_id="esp32-1",
+        location="office",
+        readings=[Reading("temp", temp, "C"), Reading("humidity", humidity, "%")],
+    )
+
+
+def context(temp: float, humidity: float) -> dict:
+    return {
+        "esp32-1": {
+            "temp": {"last_value": temp, "condition_active": False},
+            "humidity": {"last_value": humidity, "condition_active": False},
+        }
+    }
+
+
+class AnalyzeCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.client = OllamaClient(base_url="http://ollama.invalid")
+        self.addCleanup(self.client.close)
+        self.posts = []
+        # Count requests that reach Ollama instead of opening a connection
+        self.client._client.post = lambda url, **kwargs: self.posts.append(url) or FakeResponse()
+
+    def test_near_identical_telemetry_builds_identical_prompts(self):
+        first = self.client._build_prompt(telemetry(22.31, 41.04), context(22.28, 40.97))
+        second = self.client._build_prompt(telemetry(22.34, 40.96), context(22.33, 41.02))
+        self.assertEqual(first, second)
+        self.assertIn("last=22.3,", first)
+        self.assertIn("last=41.0,", first)
+
+    def test_near_identical_telemetry_hits_cache(self):
+        self.assertIsNone(self.client.analyze(telemetry(22.31, 41.04), context(22.28, 40.97)))
+        self.assertIsNone(self.client.analyze(telemetry(22.34, 40.96), context(22.33, 41.02)))
+        self.assertEqual(self.client.cache_misses, 1)
+        self.assertEqual(self.client.cache_hits, 1)
+        self.assertEqual(len(self.posts), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+"""Upload format sniffing in VoiceService._transcribe_file."""
+
+import io
+import unittest
+
+from src.services.voice_service import VoiceService
+
+# A real first box/page for each container, padded past the 12-byte sniff window
+MP4_HEAD = b"\x00\x00\x00\x20ftypisom\x00\x00\x02\x00isomiso2mp41" + b"\x00" * 64
+WEBM_HEAD = b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01" + b"\x00" * 64
+OGG_HEAD = b"OggS\x00\x02" + b"\x00" * 64
+RAW_PCM = bytes(range(256)) * 4
+
+
+class TranscribeFileSniffTest(unittest.TestCase):
+    def setUp(self):
+        self.service = VoiceService()
+        self.decoded: list[bytes] = []
+        self.recognized: list[bytes] = []
+        # Record which path an upload takes instead of running Vosk/ffmpeg
+        self.service._transcribe_bytes = lambda data, rate: self.decoded.append(bytes(data)) or "decoded"
+        self.service._recognize = lambda chunks, rate: self.recognized.append(b"".join(chunks)) or "raw"
+
+    def assert_decoded(self, data: bytes):
+        self.assertEqual(self.service._transcribe_file(io.BytesIO(data), 16000), "decoded")
+        # The whole file reaches the decoder, from its first byte
+        self.assertEqual(self.decoded, [data])
+        self.assertEqual(self.recognized, [])
+
+    def test_mp4_is_decoded(self):
+        self.assert_decoded(MP4_HEAD)
+
+    def test_webm_is_decoded(self):
+        self.assert_decoded(WEBM_HEAD)
+
+    def test_ogg_is_decoded(self):
+        self.assert_decoded(OGG_HEAD)
+
+    def test_raw_pcm_streams_from_the_start(self):
+        self.assertEqual(self.service._transcribe_file(io.BytesIO(RAW_PCM), 16000), "raw")
+        self.assertEqual(self.recognized, [RAW_PCM])
+        self.assertEqual(self.decoded, [])
+
+    def test_sniff_agrees_with_bytes_path(self):
+        for data in (MP4_HEAD, WEBM_HEAD, OGG_HEAD):
+            self.assertTrue(VoiceService._needs_decoding(data))
+        self.assertFalse(VoiceService._needs_decoding(RAW_PCM))
+
+
+if __name__ == "__main__":
+    unittest.main()
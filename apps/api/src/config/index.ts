@@ -16,6 +16,8 @@ const REDIS_URL = process.env.REDIS_URL ?? "redis://localhost:6379";
 
 const OLLAMA_URL = process.env.OLLAMA_URL ?? "http://host.docker.internal:11434";
 const OLLAMA_MODEL = process.env.OLLAMA_MODEL ?? "llama3.2:3b";
+const OLLAMA_CACHE_TTL_MS = Number(process.env.OLLAMA_CACHE_TTL_MS ?? 60_000);
+const OLLAMA_CACHE_MAX = Number(process.env.OLLAMA_CACHE_MAX ?? 512);
 
 const mqttUrl = MQTT_URL ?? `mqtt://${MQTT_HOST}:${MQTT_PORT}`;
 
@@ -34,5 +36,7 @@ export const config = {
   ollama: {
     url: OLLAMA_URL,
     model: OLLAMA_MODEL,
+    cacheTtlMs: OLLAMA_CACHE_TTL_MS,
+    cacheMax: OLLAMA_CACHE_MAX,
   },
 } as const;
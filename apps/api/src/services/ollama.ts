@@ -1,3 +1,4 @@
+import { createHash } from "node:crypto";
 import { config } from "../config/index.js";
 import { buildSystemPrompt } from "./systemPrompt.js";
 
@@ -8,9 +9,89 @@ export type OllamaIntent =
   | { intent: "analyze"; timeframe: string; metric?: "temperature" | "humidity" | "all"; reply: string; summary?: string }
   | { intent: "none"; reply: string };
 
+// JSON schema for Ollama structured outputs. Constrains decoding to the
+// OllamaIntent shape so replies parse on the first try.
+const INTENT_SCHEMA = {
+  type: "object",
+  properties: {
+    intent: { type: "string", enum: ["command", "query", "history", "analyze", "none"] },
+    reply: { type: "string" },
+    target: { type: "string" },
+    action: { type: "string" },
+    value: {},
+    sensor: { type: "string" },
+    timeframe: { type: "string" },
+    category: { type: "string", enum: ["commands", "events", "all"] },
+    metric: { type: "string", enum: ["temperature", "humidity", "all"] },
+    summary: { type: "string" },
+  },
+  required: ["intent", "reply"],
+} as const;
+
+// LRU of parsed intents keyed by a hash of system prompt + normalized message.
+// The system prompt embeds current readings and device state, so a change
+// there naturally misses the cache instead of serving a stale reply.
+const intentCache = new Map<string, { intent: OllamaIntent; expiresAt: number }>();
+const inflightIntents = new Map<string, Promise<OllamaIntent>>();
+
+// Only whitespace is folded: casing reaches the prompt (names, command values),
+// so messages differing in case must not share a cached reply
+function normalizeMessage(message: string): string {
+  return message.split(/\s+/).filter(Boolean).join(" ");
+}
+
+function getCachedIntent(key: string): OllamaIntent | undefined {
+  const entry = intentCache.get(key);
+  if (!entry) return undefined;
+  if (entry.expiresAt <= Date.now()) {
+    intentCache.delete(key);
+    return undefined;
+  }
+  // Re-insert to mark as most recently used
+  intentCache.delete(key);
+  intentCache.set(key, entry);
+  return entry.intent;
+}
+
+function setCachedIntent(key: string, intent: OllamaIntent): void {
+  if (config.ollama.cacheTtlMs <= 0) return;
+  intentCache.set(key, { intent, expiresAt: Date.now() + config.ollama.cacheTtlMs });
+  while (intentCache.size > config.ollama.cacheMax) {
+    const oldest = intentCache.keys().next().value;
+    if (oldest === undefined) break;
+    intentCache.delete(oldest);
+  }
+}
+
 export async function interpretMessage(message: string): Promise<OllamaIntent> {
   const systemPrompt = buildSystemPrompt();
+  const cacheKey = createHash("sha1")
+    .update(systemPrompt)
+    .update("\u0000")
+    .update(normalizeMessage(message))
+    .digest("hex");
+
+  const cached = getCachedIntent(cacheKey);
+  if (cached) {
+    return cached;
+  }
+
+  // Coalesce identical concurrent requests onto a single Ollama call
+  const pending = inflightIntents.get(cacheKey);
+  if (pending) {
+    return pending;
+  }
+
+  const request = requestIntent(message, systemPrompt, cacheKey);
+  inflightIntents.set(cacheKey, request);
+  try {
+    return await request;
+  } finally {
+    inflightIntents.delete(cacheKey);
+  }
+}
 
+async function requestIntent(message: string, systemPrompt: string, cacheKey: string): Promise<OllamaIntent> {
   const response = await fetch(`${config.ollama.url}/api/generate`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
@@ -19,7 +100,7 @@ export async function interpretMessage(message: string): Promise<OllamaIntent> {
       prompt: message,
       system: systemPrompt,
       stream: false,
-      format: "json",
+      format: INTENT_SCHEMA,
     }),
   });
 
@@ -44,6 +125,7 @@ export async function interpretMessage(message: string): Promise<OllamaIntent> {
       }
     }
 
+    setCachedIntent(cacheKey, parsed);
     return parsed;
   } catch (parseError) {
     console.error("Failed to parse Ollama response:", data.response, parseError);
@@ -71,7 +153,7 @@ export async function* interpretMessageStream(
       prompt: message,
       system: systemPrompt,
       stream: true,
-      format: "json",
+      format: INTENT_SCHEMA,
     }),
   });
 
@@ -9,6 +9,11 @@ import json
 import time
 
 
+def _json_fmt_literal(value):
+    """JSON-encode a value for embedding in a %-format template."""
+    return json.dumps(value).replace("%", "%%")
+
+
 class HomeHubClient:
     VERSION = 1
 
@@ -29,6 +34,16 @@ class HomeHubClient:
         self.capabilities = {"sensors": [], "actuators": []}
         self._command_handler = None
         self._firmware_version = "1.0.0"
+        # Envelope fields that never change, pre-serialized once; _publish
+        # only fills in type, ts and the payload JSON
+        self._envelope_fmt = '{"v":%d,"deviceId":%s,"location":%s,"type":"%%s","ts":%%d,"payload":%%s}' % (
+            self.VERSION, _json_fmt_literal(device_id), _json_fmt_literal(location)
+        )
+        self._telemetry_fmt = None
+        self._telemetry_pub = None
+        self._topic_prefix = "home/%s/%s/" % (location, device_id)
+        # Per message type topic strings, built on first use
+        self._topics = {}
 
     def set_firmware_version(self, version: str):
         """Set the firmware version reported in birth messages."""
@@ -50,6 +65,8 @@ class HomeHubClient:
         if values:
             sensor["values"] = values
         self.capabilities["sensors"].append(sensor)
+        # Default telemetry schema: every registered sensor, in registration order
+        self.set_telemetry_schema([s["id"] for s in self.capabilities["sensors"]])
 
     def register_actuator(self, id: str, type: str, name: str, **kwargs):
         """
@@ -81,7 +98,8 @@ class HomeHubClient:
             "capabilities": self.capabilities,
             "telemetryIntervalMs": telemetry_interval_ms
         }
-        self._publish("birth", payload, topic=f"home/_registry/{self.device_id}/birth")
+        # QoS 1: registration must reach the broker even if the first frame is lost
+        self._publish("birth", payload, topic=f"home/_registry/{self.device_id}/birth", qos=1)
 
     def set_last_will(self):
         """
@@ -96,7 +114,7 @@ class HomeHubClient:
             "type": "will",
             "payload": {"status": "offline"}
         })
-        self.mqtt.set_last_will(will_topic, will_msg)
+        self.mqtt.set_last_will(will_topic, will_msg, qos=1)
 
     def publish_telemetry(self, readings: list):
         """
@@ -107,6 +125,33 @@ class HomeHubClient:
         """
         self._publish("telemetry", {"readings": readings})
 
+    def set_telemetry_schema(self, sensor_ids):
+        """
+        Fix the sensors reported by publish_telemetry_values().
+
+        The readings JSON is compiled into a template once, so each tick only
+        formats the numbers in. register_sensor() sets this to all registered
+        sensors; call it only to report a different set or order.
+
+        Args:
+            sensor_ids: Sensor identifiers in the order their values will be given
+        """
+        self._telemetry_fmt = '{"readings":[%s]}' % ",".join(
+            '{"id":%s,"value":%%s}' % _json_fmt_literal(sensor_id) for sensor_id in sensor_ids
+        )
+        # QoS 0: periodic readings are superseded every tick, so never block on a PUBACK
+        self._telemetry_pub = self.mqtt.prepare_publisher(self._topic_prefix + "telemetry", qos=0)
+
+    def publish_telemetry_values(self, values):
+        """
+        Publish numeric readings for the sensors given to set_telemetry_schema().
+
+        Args:
+            values: Reading values, in schema order (e.g., (23.5, 41))
+        """
+        payload_json = self._telemetry_fmt % tuple(values)
+        self._telemetry_pub.publish((self._envelope_fmt % ("telemetry", int(time.time() * 1000), payload_json)).encode())
+
     def publish_status(self, uptime_ms: int, free_heap: int = None, rssi: int = None):
         """
         Publish device health/heartbeat status.
@@ -116,12 +161,13 @@ class HomeHubClient:
             free_heap: Available heap memory in bytes
             rssi: WiFi signal strength in dBm
         """
-        payload = {"uptime": uptime_ms}
+        # Fixed integer fields, so format the JSON directly instead of json.dumps
+        payload_json = '{"uptime":%d' % uptime_ms
         if free_heap is not None:
-            payload["freeHeap"] = free_heap
+            payload_json += ',"freeHeap":%d' % free_heap
         if rssi is not None:
-            payload["rssi"] = rssi
-        self._publish("status", payload)
+            payload_json += ',"rssi":%d' % rssi
+        self._publish_raw("status", payload_json + "}")
 
     def publish_ack(self, correlation_id: str, status: str, target: str, actual_value, error: str = None):
         """
@@ -142,7 +188,8 @@ class HomeHubClient:
         }
         if error:
             payload["error"] = error
-        self._publish("ack", payload)
+        # QoS 1: the server is waiting on this correlationId
+        self._publish("ack", payload, qos=1)
 
     def on_command(self, handler):
         """
@@ -183,16 +230,15 @@ class HomeHubClient:
         """
         self.mqtt.check_msg()
 
-    def _publish(self, msg_type: str, payload: dict, topic: str = None):
+    def _publish(self, msg_type: str, payload: dict, topic: str = None, qos: int = 0):
         """Wrap payload in envelope and publish to MQTT."""
-        envelope = {
-            "v": self.VERSION,
-            "ts": int(time.time() * 1000),
-            "deviceId": self.device_id,
-            "location": self.location,
-            "type": msg_type,
-            "payload": payload
-        }
+        self._publish_raw(msg_type, json.dumps(payload), topic, qos)
+
+    def _publish_raw(self, msg_type: str, payload_json: str, topic: str = None, qos: int = 0):
+        """Wrap an already-serialized JSON payload in the envelope and publish."""
+        envelope = self._envelope_fmt % (msg_type, int(time.time() * 1000), payload_json)
         if topic is None:
-            topic = f"home/{self.location}/{self.device_id}/{msg_type}"
-        self.mqtt.publish(topic, json.dumps(envelope))
+            topic = self._topics.get(msg_type)
+            if topic is None:
+                topic = self._topics[msg_type] = self._topic_prefix + msg_type
+        self.mqtt.publish(topic, envelope.encode(), qos=qos)
@@ -7,25 +7,34 @@ class TempSensor:
         self._pin = machine.Pin(pin)
         self._retries = retries
         self._retry_delay_ms = retry_delay_ms
+        # DHT sensors reject reads closer together than their sampling period,
+        # so reads inside that window return the last sample
+        self._last = None
+        self._last_ts = 0
 
         sensor_upper = sensor.upper()
         if sensor_upper == "DHT11":
             self._dht = dht.DHT11(self._pin)
+            self._min_interval_ms = 1000
         elif sensor_upper == "DHT22":
             self._dht = dht.DHT22(self._pin)
+            self._min_interval_ms = 2000
         else:
             raise ValueError("sensor must be 'DHT11' or 'DHT22'")
 
     def read(self):
+        if self._last is not None and time.ticks_diff(time.ticks_ms(), self._last_ts) < self._min_interval_ms:
+            return self._last
+
         last_err = None
         for _ in range(self._retries):
             try:
                 self._dht.measure()
                 temp_c = self._dht.temperature()
                 humidity = self._dht.humidity()
-                print("Temperature: ", temp_c)
-                print("Humidity: ", humidity)
-                return temp_c, humidity
+                self._last = (temp_c, humidity)
+                self._last_ts = time.ticks_ms()
+                return self._last
             except OSError as e:
                 last_err = e
                 time.sleep_ms(self._retry_delay_ms)
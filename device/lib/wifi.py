@@ -8,14 +8,11 @@ _wlan = network.WLAN(network.STA_IF)
 def scan():
     _wlan.active(True)
 
-    results = []
-    for item in _wlan.scan():
-        ssid = item[0]
-        if isinstance(ssid, bytes):
-            ssid = ssid.decode("utf-8", "ignore")
-        results.append(ssid)
-
-    return results
+    # SSIDs arrive as bytes on current firmware; built in a single pass
+    return [
+        item[0].decode("utf-8", "ignore") if isinstance(item[0], bytes) else item[0]
+        for item in _wlan.scan()
+    ]
 
 
 def connect(ssid, password, timeout_s=10):
@@ -30,11 +27,14 @@ def connect(ssid, password, timeout_s=10):
 
     _wlan.connect(ssid, password)
 
+    # Short polls notice association as soon as it happens; time.sleep_ms
+    # yields to the WiFi task between checks
     start = time.ticks_ms()
+    timeout_ms = timeout_s * 1000
     while not _wlan.isconnected():
-        if time.ticks_diff(time.ticks_ms(), start) > timeout_s * 1000:
+        if time.ticks_diff(time.ticks_ms(), start) > timeout_ms:
             return False
-        time.sleep(0.25)
+        time.sleep_ms(20)
 
     print("WiFi connected:", _wlan.ifconfig())
     return True
@@ -4,8 +4,9 @@ from lib.home_hub import HomeHubClient
 from lib import wifi
 from secrets import SSID, PASSWORD
 
+import random
 import time
-from services.mqtt import MqttService
+from services.mqtt import MqttService, TRANSIENT_ERRNOS
 
 try:
     from secrets import MQTT_HOST, MQTT_PORT, MQTT_CLIENT_ID, DEVICE_LOCATION
@@ -19,6 +20,9 @@ except ImportError:
     SENSOR_TYPE = "DHT11"
     LED_PIN = 5
 
+# secrets.py may give the port as a string; convert once here
+MQTT_PORT = int(MQTT_PORT)
+
 # Firmware version
 FIRMWARE_VERSION = "1.1.0"
 # TODO: make this a registry.json item. This way devices (once flashed) will broadcast their own interval timing.
@@ -38,7 +42,7 @@ wifi.ensure_connected(SSID, PASSWORD)
 mqtt = MqttService(
     client_id=MQTT_CLIENT_ID,
     host=MQTT_HOST,
-    port=int(MQTT_PORT),
+    port=MQTT_PORT,
     keepalive=30,
 )
 
@@ -63,13 +67,15 @@ temp_sensor = TempSensor(pin=SENSOR_PIN, sensor=SENSOR_TYPE)
 
 # Detect if sensor is connected
 def detect_sensor():
+    """Take one reading; returns it, or None if no sensor answered."""
     try:
-        temp_sensor.read()
-        return True
+        return temp_sensor.read()
     except:
-        return False
+        return None
 
-SENSOR_PRESENT = detect_sensor()
+# Published as the first telemetry sample instead of reading again right away
+FIRST_SAMPLE = detect_sensor()
+SENSOR_PRESENT = FIRST_SAMPLE is not None
 if SENSOR_PRESENT:
     print(f"[Sensor] {SENSOR_TYPE} detected on pin {SENSOR_PIN}")
 else:
@@ -109,40 +115,100 @@ print(f"[HomeHub] Device {MQTT_CLIENT_ID} online at {DEVICE_LOCATION}")
 # Track uptime
 boot_time = time.ticks_ms()
 
-# Main loop
-backoff = 1
-
-while True:
-    try:
-        if not mqtt.is_connected():
-            mqtt.connect()
-            hub.publish_birth(telemetry_interval_ms=TELEMETRY_INTERVAL_MS)
-            backoff = 1
-
-        # Check for incoming commands
-        hub.check_messages()
-
-        # Read and publish telemetry if sensor present
-        if SENSOR_PRESENT:
-            temp, humidity = temp_sensor.read()
-            hub.publish_telemetry([
-                {"id": "temp1", "value": temp},
-                {"id": "hum1", "value": humidity}
-            ])
-        else:
-            # Keep MQTT connection alive when not publishing telemetry
-            mqtt.ping()
-
-        # Avoid tight loop, stay responsive to commands
-        time.sleep(TELEMETRY_INTERVAL_MS // 1000)
-
-    except Exception as e:
-        print(f"[Error] {e}")
-        # Reset MQTT and back off on any failure
+# Main loop: block on the MQTT socket between telemetry ticks, so commands are
+# handled as soon as they arrive and the CPU idles otherwise
+COMMAND_POLL_MS = 50
+# Consecutive transient socket errors tolerated before treating the link as dead
+MAX_TRANSIENT_ERRORS = 3
+
+
+def run():
+    # Run as a function so these bindings are fast locals rather than
+    # module-global dict lookups on every iteration
+    ticks_ms = time.ticks_ms
+    ticks_diff = time.ticks_diff
+    ticks_add = time.ticks_add
+    check_messages = hub.check_messages
+    wait_msg = mqtt.wait_msg
+    publish_values = hub.publish_telemetry_values
+    read_sensor = temp_sensor.read
+    interval_ms = TELEMETRY_INTERVAL_MS
+    sensor_present = SENSOR_PRESENT
+    first_sample = FIRST_SAMPLE
+
+    backoff = 1
+    transient_errors = 0
+    next_pub = ticks_ms()
+
+    while True:
         try:
-            mqtt.disconnect()
-        except:
-            pass
-
-        time.sleep(backoff)
-        backoff = min(backoff * 2, 30)
+            if not mqtt.is_connected():
+                mqtt.connect()
+                hub.publish_birth(telemetry_interval_ms=interval_ms)
+                backoff = 1
+
+            # Check for incoming commands
+            check_messages()
+
+            remaining = ticks_diff(next_pub, ticks_ms())
+            if remaining > 0:
+                # Wake on incoming data or at the next telemetry tick
+                wait_msg(remaining)
+                transient_errors = 0
+                continue
+
+            # Read and publish telemetry if sensor present
+            if sensor_present:
+                sample = first_sample
+                first_sample = None
+                if sample is None:
+                    # Sensor failures (dht raises OSError(ETIMEDOUT)) skip this
+                    # tick only; they say nothing about the MQTT connection
+                    try:
+                        sample = read_sensor()
+                    except OSError as e:
+                        print(f"[Sensor] Read failed: {e}")
+                if sample is not None:
+                    publish_values(sample)
+            else:
+                # Keep MQTT connection alive when not publishing telemetry
+                mqtt.ping()
+
+            transient_errors = 0
+            next_pub = ticks_add(next_pub, interval_ms)
+            # After a long stall (e.g. reconnect), don't burst to catch up
+            now = ticks_ms()
+            if ticks_diff(now, next_pub) > 0:
+                next_pub = ticks_add(now, interval_ms)
+
+        except Exception as e:
+            # Sensor errors are handled above, so anything here came from MQTT
+            if isinstance(e, OSError) and e.errno in TRANSIENT_ERRNOS and mqtt.is_connected():
+                transient_errors += 1
+                # A socket that TCP keepalive has declared dead also reports
+                # ETIMEDOUT, on every call, so only a short run is tolerated
+                if transient_errors < MAX_TRANSIENT_ERRORS:
+                    print(f"[Error] {e} (transient, keeping connection)")
+                    time.sleep_ms(COMMAND_POLL_MS)
+                    continue
+
+            transient_errors = 0
+            print(f"[Error] {e}")
+            # Reset MQTT and back off on any other failure
+            try:
+                mqtt.disconnect()
+            except:
+                pass
+
+            if not wifi.is_connected():
+                # Link loss, not the broker: wait for Wi-Fi and reconnect right away
+                wifi.ensure_connected(SSID, PASSWORD)
+                backoff = 1
+                continue
+
+            # +/-25% jitter so a fleet dropped by the same broker doesn't reconnect in lockstep
+            time.sleep_ms(backoff * 750 + random.getrandbits(9) * backoff)
+            backoff = min(backoff * 2, 30)
+
+
+run()
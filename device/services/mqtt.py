@@ -1,8 +1,61 @@
 # /device/services/mqtt.py
 
 from umqtt.simple import MQTTClient
+import errno
+import select
+import socket
 import time
 
+# Socket errors that mean "try again", not "connection lost"
+TRANSIENT_ERRNOS = (errno.EAGAIN, errno.ETIMEDOUT)
+
+# Upper bound on messages handled per check_msg() so a flood can't starve the loop
+_MAX_DRAIN = 8
+
+# Outgoing QoS 0 PUBLISH frames are built here; larger ones fall back to umqtt
+_TX_BUF_SIZE = 512
+
+
+def _encode_publish_into(buf, retain, prefix, payload):
+    """Serialize a QoS 0 PUBLISH frame into buf and return its length, or 0 if it won't fit."""
+    prefix_len = len(prefix)
+    sz = prefix_len + len(payload)
+    # Fixed header is 1 byte + up to 4 bytes of remaining length
+    if sz + 5 > len(buf):
+        return 0
+    buf[0] = 0x31 if retain else 0x30
+    i = 1
+    while sz > 0x7F:
+        buf[i] = (sz & 0x7F) | 0x80
+        sz >>= 7
+        i += 1
+    buf[i] = sz
+    i += 1
+    buf[i:i + prefix_len] = prefix
+    i += prefix_len
+    end = i + len(payload)
+    buf[i:end] = payload
+    return end
+
+
+class PreparedPublisher:
+    """
+    Publisher bound to one topic, with the topic's wire encoding built once.
+
+    Get one from MqttService.prepare_publisher() for topics published every tick.
+    """
+
+    def __init__(self, service, topic, qos=0, retain=False):
+        self._service = service
+        self.topic = topic.encode() if isinstance(topic, str) else topic
+        self.qos = qos
+        self.retain = retain
+        # Variable header of a QoS 0 PUBLISH: 2-byte topic length + topic
+        self.prefix = bytes((len(self.topic) >> 8, len(self.topic) & 0xFF)) + self.topic
+
+    def publish(self, payload: bytes):
+        self._service._send(self, payload, self.retain, self.qos)
+
 class MqttService:
     def __init__(
             self,
@@ -22,9 +75,16 @@ class MqttService:
 
         self._client = None
         self._connected = False
+        self._poller = None
         self._last_will = None
         self._callback = None
+        self._delivered = False
         self._subscriptions = []
+        # Prepared publisher for each topic published to; the set is small and fixed
+        self._publishers = {}
+        # Reused for every QoS 0 publish so the hot path doesn't allocate frames
+        self._tx_buf = bytearray(_TX_BUF_SIZE)
+        self._tx_mv = memoryview(self._tx_buf)
 
     def connect(self):
         if self._connected:
@@ -50,15 +110,31 @@ class MqttService:
 
         self._client.connect()
         self._connected = True
+        self._tune_socket()
 
         # Apply callback after connect (umqtt.simple requires this order)
         if self._callback:
-            self._client.set_callback(self._callback)
+            self._client.set_callback(self._on_message)
 
         # Re-subscribe to any topics after reconnect
         for topic in self._subscriptions:
             self._client.subscribe(topic)
 
+    def _tune_socket(self):
+        """Disable Nagle and turn on TCP keepalive for the broker socket."""
+        sock = self._client.sock
+        try:
+            # Send small PUBLISH/PINGREQ frames immediately
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except (AttributeError, OSError):
+            # Not every port/lwIP build exposes TCP_NODELAY; keep the default
+            pass
+        try:
+            # Let lwIP notice a dead peer between MQTT pings
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        except (AttributeError, OSError):
+            pass
+
     def disconnect(self):
         if self._client:
             try:
@@ -67,16 +143,55 @@ class MqttService:
                 pass
         self._connected = False
         self._client = None
+        self._poller = None
+
+    def publish(self, topic: str, payload: bytes, retain=False, qos=0):
+        """
+        Publish an already-encoded payload.
+
+        Args:
+            topic: Topic to publish to
+            payload: Message bytes (callers encode; frame lengths are byte counts)
+            retain: Whether the broker should retain the message
+            qos: QoS level (0 or 1)
+        """
+        pub = self._publishers.get(topic)
+        if pub is None:
+            pub = self._publishers[topic] = PreparedPublisher(self, topic)
+        self._send(pub, payload, retain, qos)
+
+    def prepare_publisher(self, topic: str, qos: int = 0, retain: bool = False) -> PreparedPublisher:
+        """
+        Pre-encode a topic that will be published to repeatedly.
+
+        Args:
+            topic: Topic to publish to
+            qos: QoS level (0 or 1)
+            retain: Whether to retain published messages
+        """
+        return PreparedPublisher(self, topic, qos=qos, retain=retain)
 
-    def publish(self, topic: str, payload: str | bytes, retain=False, qos=0):
+    def _send(self, pub, payload, retain, qos):
         if not self._connected:
             raise RuntimeError("MQTT not connected")
 
-        if isinstance(payload, str):
-            payload = payload.encode()
+        if qos == 0:
+            n = _encode_publish_into(self._tx_buf, retain, pub.prefix, payload)
+            if n:
+                # One write for the whole frame instead of umqtt's header/topic/payload writes
+                frame = self._tx_mv[:n]
+                try:
+                    self._client.sock.write(frame)
+                except OSError as e:
+                    if e.errno not in TRANSIENT_ERRNOS:
+                        raise
+                    # Nothing went out; retry once before giving up on the connection
+                    time.sleep_ms(20)
+                    self._client.sock.write(frame)
+                return
 
         self._client.publish(
-            topic.encode(),
+            pub.topic,
             payload,
             retain=retain,
             qos=qos,
@@ -131,13 +246,42 @@ class MqttService:
         """
         self._callback = callback
         if self._connected and self._client:
-            self._client.set_callback(callback)
+            self._client.set_callback(self._on_message)
+
+    def _on_message(self, topic, msg):
+        self._delivered = True
+        self._callback(topic, msg)
+
+    def wait_msg(self, timeout_ms: int) -> bool:
+        """
+        Sleep until the broker sends something or timeout_ms passes.
+
+        Returns True if there is data for check_msg() to read. When not connected
+        this just sleeps for the timeout.
+        """
+        if not (self._connected and self._client):
+            time.sleep_ms(timeout_ms)
+            return False
+        if self._poller is None:
+            # The socket changes on every reconnect, so register lazily
+            self._poller = select.poll()
+            self._poller.register(self._client.sock, select.POLLIN)
+        return bool(self._poller.poll(timeout_ms))
 
     def check_msg(self):
         """
         Non-blocking check for incoming messages.
 
         Call this regularly in the main loop to process subscribed messages.
+        Drains everything already buffered (up to _MAX_DRAIN messages) so a
+        burst of commands doesn't wait one loop iteration per message.
         """
-        if self._connected and self._client:
-            self._client.check_msg()
\ No newline at end of file
+        if not (self._connected and self._client):
+            return
+        for _ in range(_MAX_DRAIN):
+            # umqtt's check_msg() returns None both when idle and after a
+            # delivered PUBLISH, so track delivery through the callback
+            self._delivered = False
+            self._client.check_msg()
+            if not self._delivered:
+                break
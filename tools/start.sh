@@ -22,7 +22,8 @@ if ! ollama list | grep -q "$MODEL"; then
 fi
 
 echo "Starting AI service..."
-export PIPER_MODEL_PATH=models/en_US-ryan-high.onnx
+export KOKORO_MODEL_PATH=models/kokoro-v1.0.onnx
+export KOKORO_VOICES_PATH=models/voices-v1.0.bin
 export VOSK_MODEL_PATH=models/vosk-model-small-en-us-0.15
 export MQTT_HOST=localhost
 export MQTT_PORT=1883
@@ -31,7 +32,7 @@ export OLLAMA_MODEL=llama3.2:3b
 export API_URL=http://localhost:3000
 
 cd apps/ai
-../../.venv/bin/uvicorn src.api:app --host 0.0.0.0 --port 8000 --reload &
+../../.venv/bin/uvicorn src.api:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --reload &
 AI_PID=$!
 cd ../..
 